@@ -1,10 +1,16 @@
-# Copyright (c) 2019 Renata Hodovan, Akos Kiss.
+# Copyright (c) 2019-2026 Renata Hodovan, Akos Kiss.
 #
 # Licensed under the BSD 3-Clause License
 # <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
 # This file may not be copied, modified, or distributed except
 # according to those terms.
 
-from .dump import dump, dumps
-from .load import load, loads
+from .cache import CachedLoader
+from .columns import load_columns
+from .compress import open_compressed
+from .dump import FragmentCache, digest, dump, dump_into, dumpb, dumps, dumps_many, encoded_size
+from .load import JSONxPushDecoder, load, loads, loads_many
+from .number import JSONxNumber
 from .pkgdata import __version__
+from .reformat import reformat
+from .shard import merge_arrays, split_array
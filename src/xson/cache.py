@@ -0,0 +1,174 @@
+# Copyright (c) 2026 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import hashlib
+import marshal
+import os
+import pickle
+import struct
+import sys
+
+from collections import OrderedDict
+from tempfile import NamedTemporaryFile
+from threading import Lock
+
+from .load import load
+
+
+# Snapshot files start with a magic string, the format of the payload (b'm' for
+# marshal, b'p' for pickle), and the size and modification time of the source
+# file that the snapshot was taken of.
+_SNAPSHOT_MAGIC = b'XSONSNAP'
+_SNAPSHOT_HEADER = struct.Struct(f'<{len(_SNAPSHOT_MAGIC)}sc2q')
+
+
+class CachedLoader:  # pylint: disable=too-many-instance-attributes
+    """
+    Loader of JSONx files that caches the deserialized values. The values are
+    cached in memory, with least recently used eviction, and optionally as
+    binary snapshots on disk, so that even a new process can skip parsing the
+    files. A cached value is used only if the size and the modification time
+    of its file are unchanged.
+
+    The values are shared by all callers that load the same file, thus they
+    must not be mutated. Snapshots are written with :mod:`marshal` if the
+    values consist of built-in types only, and with :mod:`pickle` otherwise,
+    thus the snapshot directory must not be writable by untrusted users.
+    Snapshots are specific to the deserialization options and to the Python
+    version. Hook functions cannot be told apart reliably (e.g., lambdas, or
+    functions whose code changes between deployments), thus if any hook is
+    given, snapshots are used only if ``snapshot_key`` is given as well.
+
+    :param int maxsize: Maximum number of values cached in memory.
+        (Default: 128)
+    :param snapshot_dir: Path of the directory to store the snapshots in. If
+        ``None``, no snapshots are used. (Default: ``None``)
+    :param str snapshot_key: Identifier of the hook functions, which must be
+        changed whenever the hooks change (e.g., a name with a version number).
+        Snapshots are specific to this key. (Default: ``None``)
+
+    The keyword arguments have the same meaning as in :func:`load`.
+    """
+
+    def __init__(self, maxsize=128, snapshot_dir=None, *, snapshot_key=None, object_hook=None, parse_float=None, parse_int=None, parse_constant=None, object_pairs_hook=None, numbers='eager', dedupe=False):
+        self.maxsize = maxsize
+        self.snapshot_dir = snapshot_dir
+        self.snapshot_key = snapshot_key
+        self.hits = 0
+        self.snapshot_hits = 0
+        self.misses = 0
+        self._kwargs = {'object_hook': object_hook, 'parse_float': parse_float, 'parse_int': parse_int, 'parse_constant': parse_constant, 'object_pairs_hook': object_pairs_hook, 'numbers': numbers, 'dedupe': dedupe}
+        self._values = OrderedDict()
+        self._lock = Lock()
+
+    def load(self, path):
+        """
+        Deserialize a JSONx file to a Python object, or get it from the cache.
+
+        :param path: Path of the file to be deserialized (may be compressed, as
+            for :func:`load`).
+        :return: The value deserialized.
+        :raises ValueError: If the file is not a valid JSONx document.
+        """
+        path = os.path.abspath(os.fsdecode(path))
+        st = os.stat(path)
+        stamp = (st.st_size, st.st_mtime_ns)
+
+        with self._lock:
+            entry = self._values.get(path)
+            if entry is not None and entry[0] == stamp:
+                self._values.move_to_end(path)
+                self.hits += 1
+                return entry[1]
+
+        snapshot_path = self._snapshot_path(path) if self._use_snapshots() else None
+        found, value = self._read_snapshot(snapshot_path, stamp) if snapshot_path else (False, None)
+        if not found:
+            with open(path, 'rb') as fp:
+                value = load(fp, **self._kwargs)
+            if snapshot_path:
+                self._write_snapshot(snapshot_path, stamp, value)
+
+        with self._lock:
+            if found:
+                self.snapshot_hits += 1
+            else:
+                self.misses += 1
+            self._values[path] = (stamp, value)
+            self._values.move_to_end(path)
+            while len(self._values) > self.maxsize:
+                self._values.popitem(last=False)
+        return value
+
+    def clear(self):
+        """
+        Remove all values from the memory cache (but keep the snapshots) and
+        reset the statistics.
+        """
+        with self._lock:
+            self._values.clear()
+            self.hits = 0
+            self.snapshot_hits = 0
+            self.misses = 0
+
+    def _use_snapshots(self):
+        if self.snapshot_dir is None:
+            return False
+        return self.snapshot_key is not None or not any(callable(v) for v in self._kwargs.values())
+
+    def _snapshot_path(self, path):
+        # Hooks are identified by snapshot_key only, and by whether they are
+        # given at all.
+        options = sorted((k, '<hook>' if callable(v) else repr(v)) for k, v in self._kwargs.items())
+        key = repr((path, options, self.snapshot_key, sys.implementation.cache_tag))
+        return os.path.join(self.snapshot_dir, hashlib.sha256(key.encode('utf-8')).hexdigest() + '.snapshot')
+
+    @staticmethod
+    def _read_snapshot(snapshot_path, stamp):
+        try:
+            with open(snapshot_path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return False, None
+
+        try:
+            magic, fmt, size, mtime_ns = _SNAPSHOT_HEADER.unpack_from(data)
+        except struct.error:
+            return False, None
+        if magic != _SNAPSHOT_MAGIC or (size, mtime_ns) != stamp:
+            return False, None
+
+        payload = memoryview(data)[_SNAPSHOT_HEADER.size:]
+        try:
+            return True, marshal.loads(payload) if fmt == b'm' else pickle.loads(payload)
+        except Exception:  # pylint: disable=broad-except
+            # A corrupt snapshot is treated as if it did not exist.
+            return False, None
+
+    @staticmethod
+    def _write_snapshot(snapshot_path, stamp, value):
+        try:
+            fmt, payload = b'm', marshal.dumps(value)
+        except ValueError:
+            try:
+                fmt, payload = b'p', pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception:  # pylint: disable=broad-except
+                # Values that cannot be pickled are not snapshotted.
+                return
+
+        # Write the snapshot atomically, so that concurrent loaders never see
+        # a partial snapshot. Failing to write a snapshot is not an error.
+        f = None
+        try:
+            os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
+            with NamedTemporaryFile('wb', dir=os.path.dirname(snapshot_path), delete=False) as f:
+                f.write(_SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, fmt, *stamp))
+                f.write(payload)
+            os.replace(f.name, snapshot_path)
+        except OSError:
+            if f is not None and os.path.exists(f.name):
+                os.remove(f.name)
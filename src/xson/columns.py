@@ -0,0 +1,161 @@
+# Copyright (c) 2026 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+from array import array
+from math import nan
+
+from .load import JSONxHandler, _decompressed, _parse
+
+
+class _RowSink:
+    """
+    Stand-in for the list of members of a record object that passes the
+    members to the columns instead.
+    """
+
+    def __init__(self, handler):
+        self._handler = handler
+
+    def append(self, member):
+        self._handler.add_cell(*member)
+
+
+class JSONxColumnsHandler(JSONxHandler):  # pylint: disable=too-many-instance-attributes
+    """
+    Handler that deserializes the objects of an array at a given path into
+    columns of the values of their members, without building the objects
+    themselves. Other elements are deserialized as usual.
+    """
+
+    def __init__(self, path=(), missing='null', **kwargs):
+        super().__init__(**kwargs)
+
+        self._path = tuple(path)
+        self._target_depth = len(self._path) + 1
+        self._missing = missing
+        self._path_depth = 0  # Number of open elements on the path.
+        self._row = _RowSink(self)
+        self.found = False
+        self.rows = 0
+        self.columns = {}
+
+    def startElementNS(self, name, qname, attrs):
+        depth = len(self.stack)
+        container = self.stack[-1]
+        step = len(container.value) if container.localname == 'array' else None
+        super().startElementNS(name, qname, attrs)
+        element = self.stack[-1]
+        if container.localname == 'object':
+            step = element.key
+
+        if self._path_depth == self._target_depth:
+            if depth == self._target_depth + 1:
+                self._expect(element.localname == 'object', 'element within the array element at path must be an object element')
+                element.value = self._row
+        elif self._path_depth == depth - 1 and not self.found and (depth == 1 or step == self._path[depth - 2]):
+            self._path_depth = depth
+            if depth == self._target_depth:
+                self._expect(element.localname == 'array', 'element at path must be an array element')
+
+    def endElementNS(self, name, qname):
+        depth = len(self.stack) - 1
+        if self._path_depth == self._target_depth and depth == self._target_depth + 1:
+            self.stack.pop()
+            self.rows += 1
+            for key, column in self.columns.items():
+                if len(column) < self.rows:
+                    column.append(self._fill(key))
+            return
+
+        super().endElementNS(name, qname)
+        if depth == self._path_depth:
+            self._path_depth -= 1
+            if depth == self._target_depth:
+                self.found = True
+
+    def add_cell(self, key, value):
+        column = self.columns.get(key)
+        if column is None:
+            column = self.columns[key] = [self._fill(key) for _ in range(self.rows)]
+        if len(column) > self.rows:
+            # The last one of duplicate member names wins, as in a dict.
+            column[-1] = value
+        else:
+            column.append(value)
+
+    def _fill(self, key):
+        if self._missing == 'error':
+            self._expect(False, f'object element must have a member named {key}')
+        return nan if self._missing == 'nan' else None
+
+
+def _numeric_column(column, numpy):
+    types = set(map(type, column))
+    if types == {int}:
+        typecode = 'q'
+    elif types and types <= {int, float}:
+        typecode = 'd'
+    else:
+        return column
+
+    try:
+        if numpy:
+            return numpy.array(column, dtype=numpy.int64 if typecode == 'q' else numpy.float64)
+        return array(typecode, column)
+    except OverflowError:
+        return column
+
+
+def load_columns(fp, *, path=(), missing='null', numpy=None, object_hook=None, parse_float=None, parse_int=None, parse_constant=None, object_pairs_hook=None, dedupe=False, max_depth=None, max_elements=None, max_string_length=None, forbid_dtd=False):
+    """
+    Deserialize an array of objects (i.e., records) in a JSONx file to columns,
+    i.e., to lists of the values of the object members with the same name,
+    without building the objects of the array.
+
+    :param fp: File-like object to be deserialized (may be compressed, as for
+        :func:`load`).
+    :param path: Names of object members and indices of array items that lead
+        from the root element to the array of objects. (Default: ``()``, i.e.,
+        the root element is the array of objects)
+    :type path: tuple or list
+    :param str missing: Policy of handling objects that do not have a member
+        that other objects have: ``'null'`` fills the column with ``None``,
+        ``'nan'`` fills it with NaN (keeping numeric columns numeric), and
+        ``'error'`` raises a :exc:`ValueError`. (Default: ``'null'``)
+    :param numpy: If true, then numeric columns are returned as NumPy arrays.
+        If false, then they are returned as :class:`array.array` objects (of
+        type ``'q'`` for integers or ``'d'`` for floats). If ``None``, then
+        NumPy is used if it can be imported. (Default: ``None``)
+
+    The other keyword arguments have the same meaning as in :func:`load`, and
+    they apply to the values in the columns and to the rest of the document.
+
+    :return: The columns, keyed by member name (in the order of their first
+        occurrence). Columns that are not numeric (or numeric with integers out
+        of the 64-bit range) are returned as lists.
+    :rtype: dict
+    :raises ValueError: If the data being deserialized is not a valid JSONx
+        document, or if there is no array of objects at the path.
+    """
+
+    if missing not in ('null', 'nan', 'error'):
+        raise ValueError(f'unsupported missing member policy: {missing!r}')
+
+    if numpy is None or numpy:
+        try:
+            import numpy  # pylint: disable=import-outside-toplevel,redefined-outer-name
+        except ImportError:
+            if numpy:
+                raise
+            numpy = None
+
+    handler = JSONxColumnsHandler(path=path, missing=missing, object_hook=object_hook, parse_float=parse_float, parse_int=parse_int, parse_constant=parse_constant, object_pairs_hook=object_pairs_hook, dedupe=dedupe, max_depth=max_depth, max_elements=max_elements, max_string_length=max_string_length, forbid_dtd=forbid_dtd)
+    _parse(_decompressed(fp), handler)
+    if not handler.found:
+        raise ValueError(f'no array element at path {list(path)}')
+
+    return {key: _numeric_column(column, numpy) for key, column in handler.columns.items()}
@@ -0,0 +1,106 @@
+# Copyright (c) 2026 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import bz2
+import gzip
+import lzma
+import os
+
+from io import TextIOWrapper
+
+
+# Supported compression formats: the functions to open them, their magic
+# bytes, and their file name extensions.
+COMPRESSIONS = {
+    'gzip': (gzip.open, b'\x1f\x8b', '.gz'),
+    'bz2': (bz2.open, b'BZh', '.bz2'),
+    'xz': (lzma.open, b'\xfd7zXZ\x00', '.xz'),
+}
+
+COMPRESSED_FILE_TYPES = (gzip.GzipFile, bz2.BZ2File, lzma.LZMAFile)
+
+
+def _is_path(file):
+    return isinstance(file, (str, bytes, os.PathLike))
+
+
+def _peek(fp, size):
+    if hasattr(fp, 'peek'):
+        return fp.peek(size)[:size]
+    if fp.seekable():
+        pos = fp.tell()
+        head = fp.read(size)
+        fp.seek(pos)
+        return head
+    return b''
+
+
+def detect_compression(file):
+    """
+    Detect the compression format of a file from its magic bytes.
+
+    :param file: Path of a file, or binary file-like object (which must be
+        peekable or seekable, otherwise no compression is detected).
+    :return: Name of the compression format, or ``None`` if the file is not
+        compressed.
+    """
+    if _is_path(file):
+        with open(file, 'rb') as f:
+            head = f.read(max(len(magic) for _, magic, _ in COMPRESSIONS.values()))
+    else:
+        head = _peek(file, max(len(magic) for _, magic, _ in COMPRESSIONS.values()))
+
+    for compression, (_, magic, _) in COMPRESSIONS.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def open_compressed(file, mode='rb', compression='auto', encoding=None):
+    """
+    Open a file that may be compressed with gzip, bz2, or xz, and
+    (de)compress its content transparently while reading or writing it.
+
+    :param file: Path of the file, or binary file-like object to read the
+        compressed data from or write it to.
+    :param str mode: ``'r'``, ``'rb'``, ``'w'``, or ``'wb'`` for binary mode,
+        or ``'rt'`` or ``'wt'`` for text mode. (Default: ``'rb'``)
+    :param compression: Name of the compression format (``'gzip'``,
+        ``'bz2'``, or ``'xz'``), ``None`` for no compression, or ``'auto'`` to
+        detect the format from the magic bytes of the input when reading, or
+        from the extension of the file name when writing (file-like objects are
+        written uncompressed). (Default: ``'auto'``)
+    :param str encoding: Encoding of the content in text mode. (Default:
+        ``'utf-8'``)
+    :return: File-like object. If ``file`` is a file-like object, closing the
+        returned object does not close it (except when no compression is used,
+        in which case ``file`` itself is returned in binary mode, and a text
+        wrapper around it in text mode).
+    """
+    if mode not in ('r', 'rb', 'rt', 'w', 'wb', 'wt'):
+        raise ValueError(f'invalid mode: {mode!r}')
+    text = mode.endswith('t')
+    mode = mode[0] + ('t' if text else 'b')
+    encoding = (encoding or 'utf-8') if text else None
+
+    if compression == 'auto':
+        if mode[0] == 'r':
+            compression = detect_compression(file)
+        elif _is_path(file):
+            ext = os.path.splitext(os.fsdecode(file))[1]
+            compression = next((c for c, (_, _, c_ext) in COMPRESSIONS.items() if c_ext == ext), None)
+        else:
+            compression = None
+
+    if compression is None:
+        if _is_path(file):
+            return open(file, mode, encoding=encoding)  # pylint: disable=unspecified-encoding
+        return TextIOWrapper(file, encoding=encoding) if text else file
+
+    if compression not in COMPRESSIONS:
+        raise ValueError(f'unsupported compression: {compression!r}')
+    return COMPRESSIONS[compression][0](file, mode, encoding=encoding)
@@ -1,31 +1,579 @@
-# Copyright (c) 2019-2022 Renata Hodovan, Akos Kiss.
+# Copyright (c) 2019-2026 Renata Hodovan, Akos Kiss.
 #
 # Licensed under the BSD 3-Clause License
 # <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
 # This file may not be copied, modified, or distributed except
 # according to those terms.
 
-from io import StringIO
+import codecs
+import re
+import sys
+
+from collections import OrderedDict
+from dataclasses import fields, is_dataclass
+from hashlib import new as hashlib_new
+from io import BytesIO, StringIO, TextIOBase
 from math import isinf, isnan
-from xml.sax.saxutils import XMLGenerator
-from xml.sax.xmlreader import AttributesNSImpl
+from threading import Lock
+from weakref import WeakKeyDictionary
+from xml.sax.saxutils import quoteattr
 
+from .number import JSONxNumber
+from .parallel import executor, thread_map
 from .pkgdata import JSONX_NS_URI, JSONX_PREFIX
 
 
-def dump(obj, fp, *, skipkeys=False, check_circular=True, allow_nan=True, indent=None, default=None, sort_keys=False):
+_XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>\n'
+_XMLNS_ATTRS = f' xmlns:{JSONX_PREFIX}="{JSONX_NS_URI}"'
+_XMLNS_DEFAULT_ATTRS = f' xmlns="{JSONX_NS_URI}"'
+
+# Namespace prefixes must be NCNames, i.e., XML names without colons.
+_NCNAME_RE = re.compile(r'[^\W\d][\w.\-\u00b7]*')
+
+# Top-level arrays and objects with fewer items are never serialized in
+# parallel, as the overhead of the worker pool would dominate.
+_PARALLEL_MIN_ITEMS = 1024
+
+
+def _attrs(name=None):
+    return f' name={quoteattr(name)}' if name is not None else ''
+
+
+def _namespace(prefix):
+    """
+    Compute the string that qualifies the names of the elements, and the
+    namespace declaration of the root element for a namespace prefix (or for
+    the default namespace, if the prefix is ``None``).
+    """
+    if prefix is None:
+        return '', _XMLNS_DEFAULT_ATTRS
+    if prefix == JSONX_PREFIX:
+        return f'{prefix}:', _XMLNS_ATTRS
+    if not isinstance(prefix, str) or not _NCNAME_RE.fullmatch(prefix) or prefix in ('xml', 'xmlns'):
+        raise ValueError(f'invalid namespace prefix: {prefix!r}')
+    return f'{prefix}:', f' xmlns:{prefix}="{JSONX_NS_URI}"'
+
+
+# Encoding plans of classes, keyed by the classes (without keeping them alive)
+# and by the options that the plans depend on.
+_FIELDS_PLANS = WeakKeyDictionary()
+_FIELDS_PLANS_LOCK = Lock()
+
+
+def _fields_plan(cls, slots, sort_keys):
+    """
+    Get the encoding plan of a class, i.e., the names of the fields to be
+    serialized as object members, paired with their pre-rendered name
+    attributes. Returns ``None`` if instances of the class cannot be
+    serialized field-wise.
+    """
+    with _FIELDS_PLANS_LOCK:
+        plans = _FIELDS_PLANS.get(cls)
+        if plans is not None and (slots, sort_keys) in plans:
+            return plans[slots, sort_keys]
+
+    # Plans are computed outside the lock, as computing one twice is harmless.
+    plan = _compute_fields_plan(cls, slots, sort_keys)
+    with _FIELDS_PLANS_LOCK:
+        _FIELDS_PLANS.setdefault(cls, {})[slots, sort_keys] = plan
+    return plan
+
+
+def _compute_fields_plan(cls, slots, sort_keys):
+    if is_dataclass(cls):
+        names = [f.name for f in fields(cls)]
+    elif slots and hasattr(cls, '__attrs_attrs__'):
+        names = [a.name for a in cls.__attrs_attrs__]
+    elif slots and hasattr(cls, '__slots__'):
+        names = []
+        for c in reversed(cls.__mro__):
+            c_slots = c.__dict__.get('__slots__', ())
+            for n in (c_slots,) if isinstance(c_slots, str) else c_slots:
+                if n not in ('__dict__', '__weakref__') and n not in names:
+                    names.append(n)
+    else:
+        return None
+
+    if sort_keys:
+        names.sort()
+    return tuple((n, _attrs(n)) for n in names)
+
+
+class FragmentCache:
+    """
+    Bounded cache of rendered JSONx fragments with least recently used
+    eviction. It maps member names to their rendered name attributes, and
+    string and integer values (together with their name attributes) to their
+    rendered elements, so that repeating names and values need not be escaped
+    and rendered again. A cache can be shared by several (but not concurrent)
+    calls of :func:`dump`, and it counts its hits and misses.
+
+    :param int maxsize: Maximum number of fragments to be cached.
+        (Default: 4096)
+    :param int max_length: Names and string values longer than this many
+        characters are never cached. (Default: 256)
+    """
+
+    def __init__(self, maxsize=4096, max_length=256):
+        self.maxsize = maxsize
+        self.max_length = max_length
+        self.hits = 0
+        self.misses = 0
+        self._fragments = OrderedDict()
+
+    def __len__(self):
+        return len(self._fragments)
+
+    @property
+    def hit_rate(self):
+        """
+        Ratio of the lookups that were served from the cache (0.0 if there
+        were no lookups yet).
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key, render, *args):
+        """
+        Look up the fragment cached for a key, or render it by calling
+        ``render`` with ``args`` and cache it.
+        """
+        fragments = self._fragments
+        fragment = fragments.get(key)
+        if fragment is None:
+            self.misses += 1
+            fragment = fragments[key] = render(*args)
+            if len(fragments) > self.maxsize:
+                fragments.popitem(last=False)
+        else:
+            self.hits += 1
+            fragments.move_to_end(key)
+        return fragment
+
+    def clear(self):
+        """
+        Remove all fragments from the cache and reset its statistics.
+        """
+        self._fragments.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+class _UTF8Writer:
+    """
+    Text file-like object that passes the UTF-8 encoding of the written strings
+    to a bytes consumer (e.g., the write method of a binary file or the update
+    method of a hash object) in large blocks.
+    """
+
+    def __init__(self, write_bytes, flush_bytes=None, errors='strict', block_size=65536):
+        self._write_bytes = write_bytes
+        self._flush_bytes = flush_bytes
+        self._errors = errors
+        self._block_size = block_size
+        self._chunks = []
+        self._size = 0
+
+    def write(self, s):
+        self._chunks.append(s)
+        self._size += len(s)
+        if self._size >= self._block_size:
+            self._write_block()
+
+    def flush(self):
+        self._write_block()
+        if self._flush_bytes:
+            self._flush_bytes()
+
+    def _write_block(self):
+        if self._chunks:
+            self._write_bytes(''.join(self._chunks).encode('utf-8', self._errors))
+            self._chunks.clear()
+            self._size = 0
+
+
+def _text_writer(fp):
+    """
+    Get a text file-like object writing to ``fp``. As with
+    :class:`xml.sax.saxutils.XMLGenerator`, any file-like object that is not a
+    text file (or a :mod:`codecs` stream writer) is considered binary, and gets
+    the UTF-8 encoding of the written strings.
+    """
+    if isinstance(fp, (TextIOBase, codecs.StreamWriter, codecs.StreamReaderWriter, _UTF8Writer)):
+        return fp
+    return _UTF8Writer(fp.write, getattr(fp, 'flush', None), errors='xmlcharrefreplace')
+
+
+class _UTF8Counter(_UTF8Writer):
+    """
+    Text file-like object that only counts the bytes of the UTF-8 encoding of
+    the written strings (encoding only the blocks that are not ASCII).
+    """
+
+    def __init__(self):
+        super().__init__(None, errors='xmlcharrefreplace')
+        self.size = 0
+
+    def _write_block(self):
+        if self._chunks:
+            s = ''.join(self._chunks)
+            self.size += len(s) if s.isascii() else len(s.encode('utf-8', self._errors))
+            self._chunks.clear()
+            self._size = 0
+
+
+class _BufferWriter:
+    """
+    Bytes consumer that copies the bytes to a writable buffer.
+    """
+
+    def __init__(self, buffer, offset):
+        self._view = memoryview(buffer).cast('B')
+        if not 0 <= offset <= len(self._view):
+            raise ValueError(f'offset is out of range: {offset} (buffer size: {len(self._view)} bytes)')
+        self.offset = offset
+
+    def write(self, b):
+        end = self.offset + len(b)
+        if end > len(self._view):
+            raise ValueError(f'buffer is too small: {len(self._view)} bytes')
+        self._view[self.offset:end] = b
+        self.offset = end
+
+
+def _is_basic_key(k):
+    return k is None or isinstance(k, (str, int, float, bool))
+
+
+def _root_wrapper(localname, indent, prefix, xml_declaration):
+    """
+    Compute the markup that precedes and follows the members of a non-empty
+    root container in the output of :func:`dump`.
+    """
+    newline = '\n' if indent is not None else ''
+    qualifier, xmlns_attrs = _namespace(prefix)
+    tag = f'{qualifier}{localname}'
+    declaration = _XML_DECLARATION if xml_declaration else ''
+    return f'{declaration}<{tag}{xmlns_attrs}>{newline}', f'</{tag}>{newline}'
+
+
+def _dump_chunk(chunk, kwargs):
+    # Serialize a chunk of the members of the root container as if it was the
+    # root container itself, and cut the wrapper off. As the wrapper does not
+    # contain any indentation, the members end up at the right level.
+    head, tail = _root_wrapper('object' if isinstance(chunk, dict) else 'array', kwargs['indent'], kwargs['prefix'], kwargs['xml_declaration'])
+    s = dumps(chunk, **kwargs)
+    assert s.startswith(head) and s.endswith(tail)
+    return s[len(head):-len(tail)]
+
+
+def _dump_parallel(obj, fp, workers, kwargs):
+    """
+    Serialize a large root array or object by splitting its members into
+    contiguous chunks, serializing the chunks in a worker pool, and writing the
+    fragments in their original order. Returns ``False`` without writing
+    anything if the members cannot be split (in which case the object has to
+    be serialized sequentially).
+    """
+    if isinstance(obj, dict):
+        items = sorted(obj.items(), key=lambda kv: kv[0]) if kwargs['sort_keys'] else list(obj.items())
+        for k, _ in items:
+            if not _is_basic_key(k) and not kwargs['skipkeys']:
+                raise TypeError(f'dictionary key is not of a basic type: {k!r}')
+        items = [(k, v) for k, v in items if _is_basic_key(k)]
+        if not items:
+            return False
+        localname = 'object'
+    else:
+        items = obj
+        localname = 'array'
+
+    chunk_size = -(-len(items) // (workers * 4))
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    if localname == 'object':
+        chunks = [dict(chunk) for chunk in chunks]
+
+    head, tail = _root_wrapper(localname, kwargs['indent'], kwargs['prefix'], kwargs['xml_declaration'])
+    with executor(workers) as pool:
+        fp.write(head)
+        for fragment in pool.map(_dump_chunk, chunks, [kwargs] * len(chunks)):
+            fp.write(fragment)
+        fp.write(tail)
+    fp.flush()
+    return True
+
+
+_SCALAR, _ARRAY, _OBJECT, _CONVERT = range(4)
+
+# Maximum number of dictionary shapes (i.e., tuples of keys) remembered during
+# a serialization.
+_MAX_SHAPES = 256
+
+
+def _encode(obj, write, *, skipkeys, check_circular, allow_nan, indent, default, sort_keys, slots, encoders, prefix, xml_declaration, cache):
+    """
+    Serialize a value in JSONx format by passing the pieces of the output to
+    ``write``. The arguments have the same meaning as in :func:`dump`.
+
+    Instead of recursing into containers, the serializer keeps the iterators
+    over the members of the open containers on an explicit stack, thus the
+    depth of the serialized value is limited by memory only. (However, when
+    the circular reference check is disabled, :exc:`RecursionError` is raised
+    above the recursion limit of the interpreter, as an unchecked circular
+    reference would never be detected otherwise.)
+    """
+
+    def _str(value):
+        if value is None:
+            return 'null'
+        if isinstance(value, bool):
+            return 'true' if value else 'false'
+        if isinstance(value, float):
+            if isnan(value):
+                return 'NaN'
+            if isinf(value):
+                return 'Infinity' if value > 0 else '-Infinity'
+        return str(value)
+
+    def _render_str(value, attrs):
+        if value:
+            # Same as escape() but without the overhead of a function call.
+            value = value.replace('&', '&amp;').replace('>', '&gt;').replace('<', '&lt;')
+            return f'<{prefix}string{attrs}>{value}</{prefix}string>'
+        return f'<{prefix}string{attrs}/>'
+
+    def _render_bool(value, attrs):
+        return f'<{prefix}boolean{attrs}>{"true" if value else "false"}</{prefix}boolean>'
+
+    def _render_int(value, attrs):
+        return f'<{prefix}number{attrs}>{str(value)}</{prefix}number>'
+
+    def _render_float(value, attrs):
+        if not allow_nan and (isinf(value) or isnan(value)):
+            raise ValueError(f'float value is out of range: {value!r}')
+        return f'<{prefix}number{attrs}>{_str(value)}</{prefix}number>'
+
+    def _render_lazy_number(value, attrs):
+        # Only the lexemes of NaN and of the infinities are out of range, other
+        # lexemes are copied verbatim even if they would overflow a float.
+        if not allow_nan and value.lexeme[-1:].isalpha():
+            float_value = float(value.lexeme)
+            if isinf(float_value) or isnan(float_value):
+                raise ValueError(f'float value is out of range: {value!r}')
+        return f'<{prefix}number{attrs}>{value.lexeme}</{prefix}number>'
+
+    def _render_none(value, attrs):  # pylint: disable=unused-argument
+        return f'<{prefix}null{attrs}/>'
+
+    def _cached_attrs(name):
+        if len(name) > cache.max_length:
+            return _attrs(name)
+        return cache.get(name, _attrs, name)
+
+    def _shape_template(keys):
+        # The template of a shape holds the name attributes of the members
+        # and, if keys are sorted, the positions of the values in sorted key
+        # order. Shapes with non-string keys (including keys of str
+        # subclasses) get no template (an empty tuple), as they may need to be
+        # skipped or converted to strings.
+        if not all(type(k) is str for k in keys):  # pylint: disable=unidiomatic-typecheck
+            return ()
+        if sort_keys:
+            order = sorted(range(len(keys)), key=keys.__getitem__)
+            return tuple(name_attrs(keys[i]) for i in order), order
+        return tuple(map(name_attrs, keys)), None
+
+    def _dict_members(value):
+        # Dictionaries with the same string keys in the same order (e.g., the
+        # rows of a table) are encoded with a template compiled when the shape
+        # is seen for the second time. Other dictionaries are encoded member
+        # by member.
+        keys = tuple(value)
+        template = shapes.get(keys)
+        if template is False:
+            template = shapes[keys] = _shape_template(keys)
+        elif template is None:
+            if len(shapes) >= _MAX_SHAPES:
+                shapes.clear()
+            shapes[keys] = False
+
+        if template:
+            member_attrs, order = template
+            values = value.values()
+            if order is not None:
+                values = map(tuple(values).__getitem__, order)
+            return list(zip(member_attrs, values)), bool(value)
+
+        members = []
+        for k, v in sorted(value.items(), key=lambda kv: kv[0]) if sort_keys else value.items():
+            # Keys of str subclasses are converted, too, as str() may differ
+            # from their value (e.g., for members of str enumerations).
+            if type(k) is not str:  # pylint: disable=unidiomatic-typecheck
+                if not _is_basic_key(k):
+                    if not skipkeys:
+                        raise TypeError(f'dictionary key is not of a basic type: {k!r}')
+                    continue
+                k = _str(k)
+            members.append((name_attrs(k), v))
+        return members, bool(value)
+
+    def _fields_members(plan):
+        def _members(value):
+            members = []
+            for n, n_attrs in plan:
+                try:
+                    members.append((n_attrs, getattr(value, n)))
+                except AttributeError:
+                    pass
+            return members, bool(plan)
+        return _members
+
+    def _error(value):
+        raise TypeError(f'cannot serialize object: {value!r}')
+
+    def _resolve(cls):
+        # Find how to serialize a type that is not in the dispatch table yet:
+        # by the first custom encoder or built-in type along its MRO, or by the
+        # fields of the class, or by the default function.
+        for base in cls.__mro__:
+            if base in encoders:
+                return _CONVERT, encoders[base]
+            if base in builtin_dispatch:
+                return builtin_dispatch[base]
+
+        plan = _fields_plan(cls, slots, sort_keys)
+        if plan is not None:
+            return _OBJECT, _fields_members(plan)
+
+        if default:
+            return _CONVERT, default
+
+        return _CONVERT, _error
+
+    builtin_dispatch = {
+        dict: (_OBJECT, _dict_members),
+        list: (_ARRAY, None),
+        str: (_SCALAR, _render_str),
+        bool: (_SCALAR, _render_bool),
+        int: (_SCALAR, _render_int),
+        float: (_SCALAR, _render_float),
+        JSONxNumber: (_SCALAR, _render_lazy_number),
+        type(None): (_SCALAR, _render_none),
+    }
+    encoders = encoders or {}
+    dispatch = dict(builtin_dispatch)
+    dispatch.update((cls, _resolve(cls)) for cls in encoders)
+
+    if indent is not None:
+        if isinstance(indent, int):
+            indent = ' ' * indent if indent > 0 else ''
+        newline = '\n'
+    else:
+        indent = ''
+        newline = ''
+    indents = ['']  # Indentation strings per level, extended on demand.
+    shapes = {}  # Shapes of dictionaries seen, mapped to their templates.
+    name_attrs = _cached_attrs if cache is not None else _attrs
+    # Floats are not cached, as 0.0 and -0.0 would be the same key. Elements
+    # are cached with the prefix baked in, thus it is part of their keys.
+    cached_types = (str, int) if cache is not None else ()
+    prefix, xmlns_attrs = _namespace(prefix)
+    max_depth = sys.getrecursionlimit()
+
+    if xml_declaration:
+        write(_XML_DECLARATION)
+
+    stack = []  # Iterators over the members of the open containers, etc.
+    ids = set()  # Identities of the open containers.
+    value, attrs = obj, xmlns_attrs
+    while True:
+        cls = type(value)
+        kind, fn = dispatch.get(cls) or dispatch.setdefault(cls, _resolve(cls))
+        conversions = 0
+        while kind is _CONVERT:
+            # A conversion function returning a value of the same kind again
+            # and again would loop forever.
+            conversions += 1
+            if conversions > max_depth:
+                raise RecursionError('maximum conversion depth exceeded')
+            value = fn(value)
+            cls = type(value)
+            kind, fn = dispatch.get(cls) or dispatch.setdefault(cls, _resolve(cls))
+
+        if kind is _SCALAR:
+            if cls in cached_types and (cls is int or len(value) <= cache.max_length):
+                write(indents[len(stack)] + cache.get((cls, prefix, attrs, value), fn, value, attrs) + newline)
+            else:
+                write(indents[len(stack)] + fn(value, attrs) + newline)
+        else:
+            if kind is _OBJECT:
+                localname = 'object'
+                members, nonempty = fn(value)
+            else:
+                localname = 'array'
+                members = value
+                nonempty = bool(value)
+
+            # An object with members that were all skipped is still written
+            # with separate start and end tags when pretty-printing.
+            if members or (nonempty and newline):
+                if check_circular:
+                    if id(value) in ids:
+                        raise ValueError('container has circular reference')
+                    ids.add(id(value))
+                elif len(stack) >= max_depth:
+                    raise RecursionError('maximum nesting depth exceeded')
+
+                write(f'{indents[len(stack)]}<{prefix}{localname}{attrs}>{newline}')
+                # The container itself is kept on the stack, otherwise a fresh
+                # container returned by a conversion function could be freed
+                # and its identity reused by another one while still in ids.
+                stack.append((iter(members), kind is _OBJECT, f'</{prefix}{localname}>{newline}', value))
+                if len(indents) == len(stack):
+                    indents.append(indents[-1] + indent)
+            else:
+                write(f'{indents[len(stack)]}<{prefix}{localname}{attrs}/>{newline}')
+
+        # Find the next value to serialize, closing the containers whose
+        # members are exhausted.
+        while stack:
+            members, is_object, end_tag, container = stack[-1]
+            for member in members:
+                break
+            else:
+                stack.pop()
+                if check_circular:
+                    ids.remove(id(container))
+                write(indents[len(stack)] + end_tag)
+                continue
+
+            if is_object:
+                attrs, value = member
+            else:
+                attrs, value = '', member
+            break
+        else:
+            break
+
+
+def dump(obj, fp, *, skipkeys=False, check_circular=True, allow_nan=True, indent=None, default=None, sort_keys=False, slots=False, encoders=None, prefix=JSONX_PREFIX, xml_declaration=True, cache=None, workers=None):
     """
     Serialize a value to a file in JSONx format.
 
     :param obj: Value to be serialized.
-    :param fp: File-like object to write JSONx :class:`str` to.
+    :param fp: File-like object to write JSONx :class:`str` to. If it is not a
+        text file (i.e., an :class:`io.TextIOBase` or a :mod:`codecs` stream
+        writer), then it is considered binary, and the UTF-8 encoding of the
+        output is written to it (in large blocks) as :class:`bytes`.
     :param bool skipkeys: If true, then dictionary keys that are not of a basic
         type (:class:`str`, :class:`int`, :class:`float`, :class:`bool`,
         ``None``) will be skipped. Otherwise, a :exc:`TypeError` is raised.
         (Default: ``False``)
     :param bool check_circular: If false, then the circular reference check for
-        container types will be skipped. Otherwise, a :exc:`ValueError` is
-        raised. (Default: ``True``)
+        container types will be skipped (and a circular reference will result in
+        a :exc:`RecursionError`, as will nesting deeper than the recursion
+        limit). Otherwise, a :exc:`ValueError` is raised, and the nesting depth
+        is not limited. (Default: ``True``)
     :param bool allow_nan: If false, then it will be a :exc:`ValueError` to
         serialize out-of-range float values (``nan``, ``inf``, ``-inf``).
         Otherwise, their JavaScript equivalents (``NaN``, ``Infinity``,
@@ -42,136 +590,161 @@ def dump(obj, fp, *, skipkeys=False, check_circular=True, allow_nan=True, indent
         raised. (Default: ``None``)
     :param bool sort_keys: If true, then the output of dictionaries will be
         sorted by key. (Default: ``False``)
+    :param bool slots: If true, then instances of classes that define
+        ``__slots__`` and instances of attrs classes will be serialized as
+        objects with their attributes as members (unset slots are skipped).
+        Instances of dataclasses are always serialized as objects with their
+        fields as members. (Default: ``False``)
+    :param encoders: If specified, it must be a mapping from types to functions
+        that get called for objects of those types (or of their subclasses),
+        and they must return an encodable version of the object. Encoders take
+        priority over ``default``. (Default: ``None``)
+    :type encoders: dict
+    :param str prefix: Namespace prefix of the elements, which must be a valid
+        XML name without colons (and other than ``xml`` or ``xmlns``),
+        otherwise a :exc:`ValueError` is raised. If ``None``, then the JSONx
+        namespace is declared as the default namespace, and the elements are
+        not prefixed, which makes the output considerably shorter.
+        (Default: ``'json'``)
+    :param bool xml_declaration: If false, then the XML declaration is
+        omitted. (Default: ``True``)
+    :param cache: If specified, then rendered member names and string and
+        integer elements are looked up in and added to this cache (which is not
+        used when serializing in parallel). (Default: ``None``)
+    :type cache: FragmentCache
+    :param int workers: If greater than 1, then the members of a large
+        top-level array or object will be serialized in parallel, by that many
+        worker processes (or threads, on free-threaded Python builds). The
+        output is identical to that of sequential serialization, but when
+        processes are used, the members as well as the ``default`` and
+        ``encoders`` functions must be picklable. (Default: ``None``)
     """
 
-    def _attrs(name=None):
-        return AttributesNSImpl({(None, 'name'): name} if name is not None else {}, None)
+    fp = _text_writer(fp)
 
-    def _str(value):
-        if value is None:
-            return 'null'
-        if isinstance(value, bool):
-            return 'true' if value else 'false'
-        if isinstance(value, float):
-            if isnan(value):
-                return 'NaN'
-            if isinf(value):
-                return 'Infinity' if value > 0 else '-Infinity'
-        return str(value)
+    if workers is not None and workers > 1 and type(obj) in (list, dict) and len(obj) >= _PARALLEL_MIN_ITEMS and not (encoders and type(obj) in encoders):
+        kwargs = {'skipkeys': skipkeys, 'check_circular': check_circular, 'allow_nan': allow_nan, 'indent': indent, 'default': default, 'sort_keys': sort_keys, 'slots': slots, 'encoders': encoders, 'prefix': prefix, 'xml_declaration': xml_declaration}
+        if _dump_parallel(obj, fp, workers, kwargs):
+            return
 
-    def _dump(value, name=None):
-        nonlocal stack, level
-        if indent is not None:
-            gen.ignorableWhitespace(indent * level)
+    _encode(obj, fp.write, skipkeys=skipkeys, check_circular=check_circular, allow_nan=allow_nan, indent=indent, default=default, sort_keys=sort_keys, slots=slots, encoders=encoders, prefix=prefix, xml_declaration=xml_declaration, cache=cache)
+    fp.flush()
 
-        if isinstance(value, dict):
-            if check_circular:
-                if id(value) in stack:
-                    raise ValueError('container has circular reference')
-                stack.add(id(value))
 
-            gen.startElementNS((JSONX_NS_URI, 'object'), None, attrs=_attrs(name))
+def dumps(obj, *, skipkeys=False, check_circular=True, allow_nan=True, indent=None, default=None, sort_keys=False, slots=False, encoders=None, prefix=JSONX_PREFIX, xml_declaration=True, cache=None, workers=None):
+    """
+    Serialize a value to a string in JSONx format.
 
-            if value:
-                if indent is not None:
-                    gen.ignorableWhitespace('\n')
-                level += 1
+    The arguments have the same meaning as in :func:`dump`.
 
-                for k, v in sorted(value.items(), key=lambda kv: kv[0]) if sort_keys else value.items():
-                    if k is not None and not isinstance(k, (str, int, float, bool)):
-                        if not skipkeys:
-                            raise TypeError(f'dictionary key is not of a basic type: {k!r}')
-                        continue
-                    _dump(v, name=_str(k))
+    :return: JSONx string.
+    :rtype: str
+    """
 
-                level -= 1
-                if indent is not None:
-                    gen.ignorableWhitespace(indent * level)
+    s = StringIO()
+    dump(obj, s, skipkeys=skipkeys, check_circular=check_circular, allow_nan=allow_nan, indent=indent, default=default, sort_keys=sort_keys, slots=slots, encoders=encoders, prefix=prefix, xml_declaration=xml_declaration, cache=cache, workers=workers)
+    return s.getvalue()
 
-            gen.endElementNS((JSONX_NS_URI, 'object'), None)
 
-            if check_circular:
-                stack.remove(id(value))
+def dumpb(obj, *, skipkeys=False, check_circular=True, allow_nan=True, indent=None, default=None, sort_keys=False, slots=False, encoders=None, prefix=JSONX_PREFIX, xml_declaration=True, cache=None, workers=None):
+    """
+    Serialize a value to UTF-8 encoded bytes in JSONx format.
 
-        elif isinstance(value, list):
-            if check_circular:
-                if id(value) in stack:
-                    raise ValueError('container has circular reference')
-                stack.add(id(value))
+    The arguments have the same meaning as in :func:`dump`.
 
-            gen.startElementNS((JSONX_NS_URI, 'array'), None, attrs=_attrs(name))
+    :return: JSONx bytes.
+    :rtype: bytes
+    """
 
-            if value:
-                if indent is not None:
-                    gen.ignorableWhitespace('\n')
-                level += 1
+    b = BytesIO()
+    dump(obj, b, skipkeys=skipkeys, check_circular=check_circular, allow_nan=allow_nan, indent=indent, default=default, sort_keys=sort_keys, slots=slots, encoders=encoders, prefix=prefix, xml_declaration=xml_declaration, cache=cache, workers=workers)
+    return b.getvalue()
 
-                for v in value:
-                    _dump(v)
 
-                level -= 1
-                if indent is not None:
-                    gen.ignorableWhitespace(indent * level)
+def encoded_size(obj, *, skipkeys=False, check_circular=True, allow_nan=True, indent=None, default=None, sort_keys=False, slots=False, encoders=None, prefix=JSONX_PREFIX, xml_declaration=True, cache=None, workers=None):
+    """
+    Compute the size of the UTF-8 encoding of a value in JSONx format (i.e., of
+    the output of :func:`dumpb`) without building the output in memory.
 
-            gen.endElementNS((JSONX_NS_URI, 'array'), None)
+    The arguments have the same meaning as in :func:`dump`.
 
-            if check_circular:
-                stack.remove(id(value))
+    :return: Size in bytes.
+    :rtype: int
+    """
 
-        elif isinstance(value, str):
-            gen.startElementNS((JSONX_NS_URI, 'string'), None, attrs=_attrs(name))
-            gen.characters(value)
-            gen.endElementNS((JSONX_NS_URI, 'string'), None)
+    counter = _UTF8Counter()
+    dump(obj, counter, skipkeys=skipkeys, check_circular=check_circular, allow_nan=allow_nan, indent=indent, default=default, sort_keys=sort_keys, slots=slots, encoders=encoders, prefix=prefix, xml_declaration=xml_declaration, cache=cache, workers=workers)
+    return counter.size
 
-        elif isinstance(value, bool):
-            gen.startElementNS((JSONX_NS_URI, 'boolean'), None, attrs=_attrs(name))
-            gen.characters(_str(value))
-            gen.endElementNS((JSONX_NS_URI, 'boolean'), None)
 
-        elif isinstance(value, (int, float)):
-            if not allow_nan and (isinf(value) or isnan(value)):
-                raise ValueError(f'float value is out of range: {value!r}')
+def dump_into(obj, buffer, offset=0, *, skipkeys=False, check_circular=True, allow_nan=True, indent=None, default=None, sort_keys=False, slots=False, encoders=None, prefix=JSONX_PREFIX, xml_declaration=True, cache=None, workers=None):
+    """
+    Serialize a value to UTF-8 encoded bytes in JSONx format directly into a
+    writable buffer (e.g., a :class:`bytearray`, an :class:`mmap.mmap`, or a
+    :class:`memoryview`), without building the output in memory. The size
+    needed can be computed in advance with :func:`encoded_size`.
+
+    :param buffer: Writable buffer to write the output to.
+    :param int offset: Position in the buffer to write the output at, which
+        must not be negative or beyond the end of the buffer. (Default: ``0``)
+
+    The keyword arguments have the same meaning as in :func:`dump`.
+
+    :return: Number of bytes written.
+    :rtype: int
+    :raises ValueError: If the offset is out of range, or if the output does
+        not fit into the buffer (in which case the buffer may already have been
+        partially written).
+    """
 
-            gen.startElementNS((JSONX_NS_URI, 'number'), None, attrs=_attrs(name))
-            gen.characters(_str(value))
-            gen.endElementNS((JSONX_NS_URI, 'number'), None)
+    writer = _BufferWriter(buffer, offset)
+    dump(obj, _UTF8Writer(writer.write, errors='xmlcharrefreplace'), skipkeys=skipkeys, check_circular=check_circular, allow_nan=allow_nan, indent=indent, default=default, sort_keys=sort_keys, slots=slots, encoders=encoders, prefix=prefix, xml_declaration=xml_declaration, cache=cache, workers=workers)
+    return writer.offset - offset
 
-        elif value is None:
-            gen.startElementNS((JSONX_NS_URI, 'null'), None, attrs=_attrs(name))
-            gen.endElementNS((JSONX_NS_URI, 'null'), None)
 
-        elif default:
-            _dump(default(value), name=name)
+def dumps_many(objs, *, skipkeys=False, check_circular=True, allow_nan=True, indent=None, default=None, sort_keys=False, slots=False, encoders=None, prefix=JSONX_PREFIX, xml_declaration=True, workers=None):
+    """
+    Serialize a batch of values to strings in JSONx format in a thread pool.
 
-        else:
-            raise TypeError(f'cannot serialize object: {value!r}')
+    Every value is serialized with its own state, and the only state shared by
+    the serializers is the cache of the encoding plans of classes (which is
+    thread-safe and immutable once computed), thus it is safe to run in
+    threads, and it scales with the number of threads on free-threaded Python
+    builds. (However, the ``default`` and ``encoders`` functions are called
+    from the threads, too. A :class:`FragmentCache` is not thread-safe, thus it
+    cannot be used here.)
 
-        if indent is not None:
-            gen.ignorableWhitespace('\n')
+    :param objs: Values to be serialized.
+    :param int workers: Number of threads. (Default: the number of CPUs on
+        free-threaded Python builds, 1 otherwise, in which case the values are
+        serialized one after the other in the calling thread)
 
-    stack = set()
-    level = 0
-    if indent is not None and isinstance(indent, int):
-        indent = ' ' * indent if indent > 0 else ''
+    The other keyword arguments have the same meaning as in :func:`dump`.
 
-    gen = XMLGenerator(fp, encoding='UTF-8', short_empty_elements=True)
-    gen.startDocument()
-    gen.startPrefixMapping(JSONX_PREFIX, JSONX_NS_URI)
-    _dump(obj)
-    gen.endPrefixMapping(JSONX_PREFIX)
-    gen.endDocument()
+    :return: JSONx strings, in the order of the values.
+    :rtype: list
+    """
+
+    kwargs = {'skipkeys': skipkeys, 'check_circular': check_circular, 'allow_nan': allow_nan, 'indent': indent, 'default': default, 'sort_keys': sort_keys, 'slots': slots, 'encoders': encoders, 'prefix': prefix, 'xml_declaration': xml_declaration}
+    return thread_map(lambda obj: dumps(obj, **kwargs), objs, workers)
 
 
-def dumps(obj, *, skipkeys=False, check_circular=True, allow_nan=True, indent=None, default=None, sort_keys=False):
+def digest(obj, algorithm='sha256', *, skipkeys=False, check_circular=True, allow_nan=True, default=None, slots=False, encoders=None, cache=None):
     """
-    Serialize a value to a string in JSONx format.
+    Compute the digest of the canonical JSONx encoding of a value (i.e., of
+    its most compact representation with dictionaries sorted by key) without
+    building the encoded string in memory. The result is the same as hashing
+    the UTF-8 encoding of ``dumps(obj, sort_keys=True)``.
 
-    The arguments have the same meaning as in :func:`dump`.
+    :param obj: Value to be hashed.
+    :param algorithm: Name of a hash algorithm accepted by :func:`hashlib.new`,
+        or a callable returning a hash object. (Default: ``'sha256'``)
 
-    :return: JSONx string.
-    :rtype: str
+    The keyword arguments have the same meaning as in :func:`dump`.
+
+    :return: Hash object updated with the encoding of the value.
     """
 
-    s = StringIO()
-    dump(obj, s, skipkeys=skipkeys, check_circular=check_circular, allow_nan=allow_nan, indent=indent, default=default, sort_keys=sort_keys)
-    return s.getvalue()
+    hash_obj = algorithm() if callable(algorithm) else hashlib_new(algorithm)
+    dump(obj, _UTF8Writer(hash_obj.update), skipkeys=skipkeys, check_circular=check_circular, allow_nan=allow_nan, default=default, sort_keys=True, slots=slots, encoders=encoders, cache=cache)
+    return hash_obj
@@ -1,18 +1,56 @@
-# Copyright (c) 2019-2023 Renata Hodovan, Akos Kiss.
+# Copyright (c) 2019-2026 Renata Hodovan, Akos Kiss.
 #
 # Licensed under the BSD 3-Clause License
 # <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
 # This file may not be copied, modified, or distributed except
 # according to those terms.
 
-from io import StringIO
+import re
+
+from io import SEEK_CUR, SEEK_END, SEEK_SET, BufferedIOBase, BytesIO, RawIOBase, StringIO, TextIOWrapper, UnsupportedOperation
 from math import isinf, isnan
+from mmap import ACCESS_READ, mmap
+from tempfile import TemporaryFile
+from xml.parsers.expat import ErrorString, ExpatError, ParserCreate
 from xml.sax import make_parser
-from xml.sax.handler import ContentHandler, ErrorHandler, feature_namespaces
+from xml.sax.handler import ContentHandler, ErrorHandler, feature_namespaces, property_lexical_handler
 
+from .compress import COMPRESSED_FILE_TYPES, detect_compression, open_compressed
+from .number import JSONxNumber
+from .parallel import executor, thread_map
 from .pkgdata import JSONX_NS_URI
 
 
+# Markup of an XML document: comments, CDATA sections, processing instructions
+# (including the XML declaration), document type declarations, and start, end,
+# or empty-element tags (with quoted attribute values that may contain '>').
+# Group 1 is '/' for end tags, group 2 is the tag name, and group 3 is '/' for
+# empty-element tags.
+_MARKUP_PATTERN = r'''<(?:!--.*?-->|!\[CDATA\[.*?\]\]>|\?.*?\?>|!DOCTYPE(?:[^'"\[>]|"[^"]*"|'[^']*'|\[.*?\])*>|(/?)([^\s/>!?][^\s/>]*)(?:[^'">]|"[^"]*"|'[^']*')*?(/?)>)'''
+_MARKUP_RE = {
+    str: re.compile(_MARKUP_PATTERN, re.DOTALL),
+    bytes: re.compile(_MARKUP_PATTERN.encode('ascii'), re.DOTALL),
+}
+
+# Comments and processing instructions (other than the XML declaration) that
+# may appear between documents in a stream, and the start of a processing
+# instruction (or of the XML declaration) with its target in group 1.
+_MISC_RE = re.compile(rb'\s*(?:<!--.*?-->|<\?(?!xml[\s?])[^\s?]+.*?\?>)', re.DOTALL)
+_PI_START_RE = re.compile(rb'<\?([^\s?]*)')
+_WHITESPACE_RE = re.compile(rb'\s*')
+
+# Complete start, end, or empty-element tag (with quoted attribute values that
+# may contain '>').
+_TAG_RE = re.compile(rb'''<[^!?](?:[^'">]|"[^"]*"|'[^']*')*>''')
+
+# Size of the first slice of a fragment fed to the parser by the push decoder.
+_PUSH_SLICE_SIZE = 4096
+
+# Top-level arrays with fewer items are never deserialized in parallel, as the
+# overhead of the worker pool would dominate.
+_PARALLEL_MIN_ITEMS = 1024
+
+
 class JSONxElement:
     def __init__(self, localname, key, value):
         self.localname = localname
@@ -20,17 +58,152 @@ class JSONxElement:
         self.value = value
 
 
-class JSONxHandler(ContentHandler, ErrorHandler):
+class JSONxSpillFile:
+    """
+    Temporary file that the spilled strings of a document are appended to, as
+    UTF-8 encoded bytes. The file is shared by the spilled strings, thus a
+    document with many large strings needs one file descriptor only. The file
+    is deleted when the spilled strings (and the file) are all closed or
+    garbage collected.
+    """
+
+    def __init__(self):
+        self._file = TemporaryFile('w+b')
+        self._size = 0
+        self._reading = False
+
+    def tell(self):
+        return self._size
+
+    def write(self, b):
+        if self._reading:
+            # Spilled strings may be read (e.g., by a string hook) while the
+            # document is still being deserialized.
+            self._file.seek(self._size)
+            self._reading = False
+        self._file.write(b)
+        self._size += len(b)
+
+    def read_at(self, pos, size):
+        self._file.seek(pos)
+        self._reading = True
+        return self._file.read(size)
+
 
-    def __init__(self, object_hook=None, parse_float=None, parse_int=None, parse_constant=None, object_pairs_hook=None):
+class JSONxSpilledString(RawIOBase):
+    """
+    Read-only binary file-like object of the UTF-8 encoded text of a spilled
+    string, i.e., of a region of a spill file.
+    """
+
+    def __init__(self, spill_file, start, size):
+        super().__init__()
+        self._spill_file = spill_file
+        self._start = start
+        self._size = size
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, b):
+        size = min(len(b), self._size - self._pos)
+        if size <= 0:
+            return 0
+        data = self._spill_file.read_at(self._start + self._pos, size)
+        b[:len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+    def seek(self, offset, whence=SEEK_SET):
+        if whence == SEEK_CUR:
+            offset += self._pos
+        elif whence == SEEK_END:
+            offset += self._size
+        if offset < 0:
+            raise ValueError(f'negative seek position {offset}')
+        self._pos = offset
+        return offset
+
+    def tell(self):
+        return self._pos
+
+    def close(self):
+        # Release the spill file, so that it is deleted when all its strings
+        # are closed.
+        super().close()
+        self._spill_file = None
+
+
+class JSONxStringBuffer:
+    """
+    Buffer for the text content of a string element that keeps the text in
+    memory up to a threshold length, and spills it to the spill file of the
+    document beyond that.
+    """
+
+    def __init__(self, threshold, spill_file):
+        self._threshold = threshold
+        self._spill_file = spill_file  # Function to get the spill file.
+        self._length = 0
+        self._buffer = StringIO()
+        self._file = None
+        self._start = 0
+
+    def write(self, s):
+        self._length += len(s)
+        if self._file is None:
+            if self._length <= self._threshold:
+                self._buffer.write(s)
+                return
+            self._file = self._spill_file()
+            self._start = self._file.tell()
+            s = self._buffer.getvalue() + s
+            self._buffer = None
+        self._file.write(s.encode('utf-8'))
+
+    def tell(self):
+        return self._length
+
+    def getvalue(self):
+        """
+        :return: The text content as a :class:`str`, or if it has been spilled,
+            a file object reading it (in text mode, at its beginning).
+        """
+        if self._file is None:
+            return self._buffer.getvalue()
+        return TextIOWrapper(JSONxSpilledString(self._file, self._start, self._file.tell() - self._start), encoding='utf-8', newline='')
+
+
+class JSONxHandler(ContentHandler, ErrorHandler):  # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, object_hook=None, parse_float=None, parse_int=None, parse_constant=None, object_pairs_hook=None, large_string_threshold=None, string_hook=None, dedupe=False, max_depth=None, max_elements=None, max_string_length=None, forbid_dtd=False, numbers='eager'):
         super().__init__()
 
+        if numbers not in ('eager', 'lazy'):
+            raise ValueError(f'unsupported number mode: {numbers!r}')
+        if numbers == 'lazy' and (parse_float or parse_int or parse_constant):
+            raise ValueError('lazy numbers cannot be parsed with parse_float, parse_int, or parse_constant')
+
         self._object_hook = object_hook
         self._parse_float = parse_float
         self._parse_int = parse_int
         self._parse_constant = parse_constant
+        self._lazy_numbers = numbers == 'lazy'
         self._object_pairs_hook = object_pairs_hook
-
+        self._large_string_threshold = large_string_threshold
+        self._string_hook = string_hook
+        self._canonical_values = {} if dedupe else None
+        self._max_depth = max_depth
+        self._max_elements = max_elements
+        self._max_string_length = max_string_length
+        self.forbid_dtd = forbid_dtd
+
+        self._elements = 0
+        self._spill_file = None  # Created when the first string is spilled.
         self.stack = [JSONxElement('root', None, None)]
 
     def startElement(self, name, attrs):
@@ -41,18 +214,30 @@ class JSONxHandler(ContentHandler, ErrorHandler):
 
     def startElementNS(self, name, qname, attrs):
         uri, localname = name
-        self._expect(uri == JSONX_NS_URI, f'unsupported namespace URI {uri}')
+        if uri != JSONX_NS_URI:
+            self._expect(False, f'unsupported namespace URI {uri}')
+
+        if self.stack[-1].localname not in ('root', 'object', 'array'):
+            self._expect(False, f'{self.stack[-1].localname} element cannot contain other elements')
 
-        self._expect(self.stack[-1].localname in ('root', 'object', 'array'), f'{self.stack[-1].localname} element cannot contain other elements')
+        self._elements += 1
+        if self._max_elements is not None and self._elements > self._max_elements:
+            self._expect(False, f'document must not contain more than {self._max_elements} elements')
+        if self._max_depth is not None and len(self.stack) > self._max_depth:
+            self._expect(False, f'elements must not be nested deeper than {self._max_depth} levels')
 
         key = attrs[(None, 'name')] if (None, 'name') in attrs else None
         if self.stack[-1].localname == 'object':
             self._expect(key is not None, 'element within an object element must have a name attribute')
+            if self._canonical_values is not None:
+                key = self._canonical(key)
 
         if localname == 'object':
             self.stack.append(JSONxElement(localname, key, []))
         elif localname == 'array':
             self.stack.append(JSONxElement(localname, key, []))
+        elif localname == 'string' and self._large_string_threshold is not None:
+            self.stack.append(JSONxElement(localname, key, JSONxStringBuffer(self._large_string_threshold, self._get_spill_file)))
         elif localname in ('string', 'number', 'boolean'):
             self.stack.append(JSONxElement(localname, key, StringIO()))
         elif localname == 'null':
@@ -77,6 +262,13 @@ class JSONxHandler(ContentHandler, ErrorHandler):
                     value = self._object_hook(value)
         elif localname == 'string':
             value = value.getvalue()
+            if self._string_hook and not isinstance(value, str):
+                value = self._string_hook(value)
+        elif localname == 'number' and self._lazy_numbers:
+            try:
+                value = JSONxNumber(value.getvalue())
+            except ValueError:
+                self._expect(False, 'number element must contain text content in floating point format')
         elif localname == 'number':
             value = value.getvalue()
             try:
@@ -94,6 +286,9 @@ class JSONxHandler(ContentHandler, ErrorHandler):
             self._expect(value in ('true', 'false'), 'boolean element must contain either true or false text content')
             value = value == 'true'
 
+        if self._canonical_values is not None and localname in ('object', 'string', 'number'):
+            value = self._canonical(value)
+
         container = self.stack[-1]
         if container.localname == 'root':
             container.value = value
@@ -104,18 +299,57 @@ class JSONxHandler(ContentHandler, ErrorHandler):
         else:
             assert False, f'unexpected container element {container.localname}'
 
+    def _canonical(self, value):
+        # Find the first equal value of the same type (and representation,
+        # which distinguishes, e.g., 0.0 and -0.0, or (1,) and (True,)) that
+        # was deserialized from the document, and use it instead.
+        cls = type(value)
+        if cls is str:
+            return self._canonical_values.setdefault(value, value)
+        if cls in (dict, list):
+            return value
+        if cls is JSONxNumber:
+            # Lazy numbers are shared only if their lexemes are the same.
+            return self._canonical_values.setdefault((cls, value.lexeme), value)
+        try:
+            return self._canonical_values.setdefault((cls, repr(value), value), value)
+        except TypeError:
+            return value
+
+    def _get_spill_file(self):
+        if self._spill_file is None:
+            self._spill_file = JSONxSpillFile()
+        return self._spill_file
+
     def characters(self, content):
         element = self.stack[-1]
-        if isinstance(element.value, StringIO):
+        if isinstance(element.value, (StringIO, JSONxStringBuffer)):
             element.value.write(content)
-        else:
-            self._expect(content.isspace(), f'{element.localname} element must not have non-whitespace character content {content}')
+            if self._max_string_length is not None and element.value.tell() > self._max_string_length:
+                self._expect(False, f'{element.localname} element must not have text content longer than {self._max_string_length} characters')
+        elif not content.isspace():
+            self._expect(False, f'{element.localname} element must not have non-whitespace character content {content}')
 
     def error(self, exception):
         self._expect(False, exception.getMessage())
 
     fatalError = error
 
+    def startDTD(self, name, public_id, system_id):  # pylint: disable=unused-argument
+        self._expect(not self.forbid_dtd, 'document type declarations are forbidden')
+
+    def endDTD(self):
+        pass
+
+    def startCDATA(self):
+        pass
+
+    def endCDATA(self):
+        pass
+
+    def comment(self, content):
+        pass
+
     def warning(self, exception):
         # Suppress warnings.
         pass
@@ -125,11 +359,165 @@ class JSONxHandler(ContentHandler, ErrorHandler):
             raise ValueError(f'{msg} [line {self._locator.getLineNumber()}, column {self._locator.getColumnNumber()}]')
 
 
-def load(fp, *, object_hook=None, parse_float=None, parse_int=None, parse_constant=None, object_pairs_hook=None):
+def _split_root_array(data):
+    """
+    Find the boundaries of the items of the root array of a JSONx document
+    without parsing it.
+
+    :return: The prolog of the document, the start and end tags of the root
+        element, and the offsets of the item boundaries in the content of the
+        root element (the first and last offsets delimit the whole content),
+        and the number of elements in the document, or ``None`` if the root
+        element is not an array or the document cannot be split.
+    """
+    if isinstance(data, str):
+        markup_re, colon, array = _MARKUP_RE[str], ':', 'array'
+    else:
+        markup_re, colon, array = _MARKUP_RE[bytes], b':', b'array'
+
+    root_start, root_end, depth, boundaries, elements = None, None, 0, [], 0
+    for m in markup_re.finditer(data):
+        end_tag, tag_name, empty_tag = m.groups()
+        if tag_name is None:
+            continue
+        if not end_tag:
+            elements += 1
+
+        if root_start is None:
+            if end_tag or empty_tag or tag_name.rpartition(colon)[2] != array:
+                return None
+            root_start = m
+            boundaries.append(m.end())
+        elif end_tag:
+            if depth == 0:
+                root_end = m
+                break
+            depth -= 1
+            if depth == 0:
+                boundaries.append(m.end())
+        elif empty_tag:
+            if depth == 0:
+                boundaries.append(m.end())
+        else:
+            depth += 1
+
+    if root_end is None:
+        return None
+    # Anything but misc markup and whitespace after the root element is left
+    # for the parser to report.
+    for m in markup_re.finditer(data, root_end.end()):
+        if m.group(2) is not None:
+            return None
+
+    boundaries[-1] = root_end.start()
+    return data[:root_start.start()], data[root_start.start():root_start.end()], data[root_end.start():root_end.end()], boundaries, elements
+
+
+def _load_chunk(doc, kwargs):
+    return _load(StringIO(doc) if isinstance(doc, str) else BytesIO(doc), **kwargs)
+
+
+class _LimitedReader:
+    """
+    Wrapper around a file-like object that raises an error as soon as more
+    than a given number of bytes (or characters, for text files) are read from
+    it.
+    """
+
+    def __init__(self, fp, limit):
+        self._fp = fp
+        self._limit = limit
+        self._consumed = 0
+
+    def read(self, size=-1):
+        remaining = self._limit - self._consumed + 1
+        data = self._fp.read(remaining if size is None or size < 0 else min(size, remaining))
+        self._consumed += len(data)
+        if self._consumed > self._limit:
+            raise ValueError(f'document must not be larger than {self._limit} {"characters" if isinstance(data, str) else "bytes"}')
+        return data
+
+    def close(self):
+        self._fp.close()
+
+
+def _load_parallel(fp, workers, kwargs, max_bytes=None):
+    """
+    Deserialize a JSONx document with a large root array by splitting the
+    content of the array at item boundaries into contiguous chunks,
+    deserializing the chunks (wrapped in the prolog and the root tags of the
+    original document) in a worker pool, and joining the results in their
+    original order. Falls back to sequential deserialization if the document
+    cannot be split.
+    """
+    try:
+        # The file descriptor of a decompressing file object refers to the
+        # compressed data, which cannot be mapped.
+        data = mmap(fp.fileno(), 0, access=ACCESS_READ) if fp.tell() == 0 and not isinstance(fp, COMPRESSED_FILE_TYPES) else None
+    except (AttributeError, OSError, UnsupportedOperation, ValueError):
+        data = None
+    if data is None:
+        data = _LimitedReader(fp, max_bytes).read() if max_bytes is not None else fp.read()
+
+    try:
+        if max_bytes is not None and len(data) > max_bytes:
+            raise ValueError(f'document must not be larger than {max_bytes} {"characters" if isinstance(data, str) else "bytes"}')
+
+        split = _split_root_array(data)
+        if split is None or len(split[3]) - 1 < _PARALLEL_MIN_ITEMS:
+            return _load(data if isinstance(data, mmap) else StringIO(data) if isinstance(data, str) else BytesIO(data), **kwargs)
+
+        prolog, root_start, root_end, boundaries, elements = split
+        if kwargs['max_elements'] is not None and elements > kwargs['max_elements']:
+            raise ValueError(f'document must not contain more than {kwargs["max_elements"]} elements')
+        items = len(boundaries) - 1
+        chunk_size = -(-items // (workers * 4))
+        docs = [prolog + root_start + data[boundaries[i]:boundaries[min(i + chunk_size, items)]] + root_end for i in range(0, items, chunk_size)]
+    finally:
+        if isinstance(data, mmap):
+            data.close()
+
+    value = []
+    with executor(workers) as pool:
+        for chunk in pool.map(_load_chunk, docs, [kwargs] * len(docs)):
+            value.extend(chunk)
+    return value
+
+
+def _decompressed(fp):
+    if isinstance(fp, (RawIOBase, BufferedIOBase)):
+        compression = detect_compression(fp)
+        if compression:
+            return open_compressed(fp, 'rb', compression=compression)
+    return fp
+
+
+def _parse(fp, handler):
+    parser = make_parser()
+    parser.setContentHandler(handler)
+    parser.setErrorHandler(handler)
+    parser.setFeature(feature_namespaces, True)
+    if handler.forbid_dtd:
+        parser.setProperty(property_lexical_handler, handler)
+    parser.parse(fp)
+
+    assert len(handler.stack) == 1 and handler.stack[0].localname == 'root'
+
+
+def _load(fp, **kwargs):
+    handler = JSONxHandler(**kwargs)
+    _parse(fp, handler)
+    return handler.stack[0].value
+
+
+def load(fp, *, object_hook=None, parse_float=None, parse_int=None, parse_constant=None, object_pairs_hook=None, numbers='eager', large_string_threshold=None, string_hook=None, dedupe=False, max_depth=None, max_elements=None, max_string_length=None, max_bytes=None, forbid_dtd=False, workers=None):
     """
     Deserialize a JSONx file to a Python object.
 
-    :param fp: File-like object to be deserialized.
+    :param fp: File-like object to be deserialized. If it is a binary file
+        compressed with gzip, bz2, or xz (detected from its magic bytes, if it
+        is peekable or seekable), then it is decompressed transparently while
+        being deserialized.
     :param object_hook: If specified, it must be a function that will be called
         with the result of any object decoded (a :class:`dict`), and its return
         value will be used instead. (Default: ``None``)
@@ -145,24 +533,70 @@ def load(fp, *, object_hook=None, parse_float=None, parse_int=None, parse_consta
     :param parse_constant: If specified, it must be a function that will be
         called with one of the following strings: ``'-Infinity'``,
         ``'Infinity'``, or ``'NaN'``. (Default: :class:`float`)
+    :param str numbers: If ``'lazy'``, then numbers are deserialized as
+        :class:`JSONxNumber` objects, which keep the text of the numbers and
+        convert it to :class:`int` or :class:`float` only when their values are
+        first used (and which are serialized with their text copied verbatim).
+        This avoids the conversion of numbers that are only passed through,
+        and the cost of converting very long integers, but it cannot be
+        combined with ``parse_float``, ``parse_int``, or ``parse_constant``.
+        If ``'eager'``, then numbers are converted while being deserialized.
+        (Default: ``'eager'``)
+    :param int large_string_threshold: If specified, then the text of strings
+        longer than this many characters is not kept in memory but spilled to
+        a temporary file (shared by all spilled strings of the document) while
+        being decoded, and a file object reading the text (in text mode, at its
+        beginning) will be used as the value of the string. The temporary file
+        is deleted when the file objects of all spilled strings are closed (or
+        garbage collected). (Default: ``None``)
+    :param string_hook: If specified, it must be a function that will be called
+        with the file object of every spilled string, and its return value
+        will be used instead. (Default: ``None``)
+    :param bool dedupe: If true, then equal strings (including the names of
+        object members) and equal numbers in the document are deserialized as
+        one shared object, as are equal hashable values returned by
+        ``object_hook`` or ``object_pairs_hook`` (e.g., small frozen
+        subtrees). Values are only shared within the document (or within
+        one chunk of it, when deserializing in parallel). (Default:
+        ``False``)
+    :param int max_depth: If specified, then elements must not be nested deeper
+        than this many levels (the root element being at level 1).
+        (Default: ``None``)
+    :param int max_elements: If specified, then the document must not contain
+        more than this many elements. (Default: ``None``)
+    :param int max_string_length: If specified, then the text content of
+        string, number, and boolean elements must not be longer than this many
+        characters. (Default: ``None``)
+    :param int max_bytes: If specified, then the document must not be larger
+        than this many bytes (or characters, if ``fp`` is a text file, and
+        after decompression, if ``fp`` is compressed). (Default: ``None``)
+    :param bool forbid_dtd: If true, then document type declarations (and thus
+        entity declarations, too) are rejected as soon as they appear, which
+        is recommended for untrusted input. (Default: ``False``)
+    :param int workers: If greater than 1, then the items of a large top-level
+        array will be deserialized in parallel, by that many worker processes
+        (or threads, on free-threaded Python builds). The boundaries of the
+        items are found by scanning the raw document (memory-mapped, if ``fp``
+        is a file), and when processes are used, the hook functions must be
+        picklable (and as file objects are not picklable, spilled strings must
+        be converted by ``string_hook``). (Default: ``None``)
     :return: The value deserialized.
     :raises ValueError: If the data being deserialized is not a valid JSONx
-        document.
+        document, or if it exceeds any of the specified limits. Limits are
+        checked while the document is being parsed, so that parsing stops as
+        soon as a limit is exceeded.
     """
 
-    handler = JSONxHandler(object_hook=object_hook, parse_float=parse_float, parse_int=parse_int, parse_constant=parse_constant, object_pairs_hook=object_pairs_hook)
+    fp = _decompressed(fp)
+    kwargs = {'object_hook': object_hook, 'parse_float': parse_float, 'parse_int': parse_int, 'parse_constant': parse_constant, 'object_pairs_hook': object_pairs_hook, 'numbers': numbers, 'large_string_threshold': large_string_threshold, 'string_hook': string_hook, 'dedupe': dedupe, 'max_depth': max_depth, 'max_elements': max_elements, 'max_string_length': max_string_length, 'forbid_dtd': forbid_dtd}
+    if workers is not None and workers > 1:
+        return _load_parallel(fp, workers, kwargs, max_bytes=max_bytes)
+    if max_bytes is not None:
+        fp = _LimitedReader(fp, max_bytes)
+    return _load(fp, **kwargs)
 
-    parser = make_parser()
-    parser.setContentHandler(handler)
-    parser.setErrorHandler(handler)
-    parser.setFeature(feature_namespaces, True)
-    parser.parse(fp)
 
-    assert len(handler.stack) == 1 and handler.stack[0].localname == 'root'
-    return handler.stack[0].value
-
-
-def loads(s, *, object_hook=None, parse_float=None, parse_int=None, parse_constant=None, object_pairs_hook=None):
+def loads(s, *, object_hook=None, parse_float=None, parse_int=None, parse_constant=None, object_pairs_hook=None, numbers='eager', large_string_threshold=None, string_hook=None, dedupe=False, max_depth=None, max_elements=None, max_string_length=None, max_bytes=None, forbid_dtd=False, workers=None):
     """
     Deserialize a JSONx string to a Python object.
 
@@ -171,4 +605,238 @@ def loads(s, *, object_hook=None, parse_float=None, parse_int=None, parse_consta
     The keyword arguments have the same meaning as in :func:`load`.
     """
 
-    return load(StringIO(s), object_hook=object_hook, parse_float=parse_float, parse_int=parse_int, parse_constant=parse_constant, object_pairs_hook=object_pairs_hook)
+    return load(StringIO(s), object_hook=object_hook, parse_float=parse_float, parse_int=parse_int, parse_constant=parse_constant, object_pairs_hook=object_pairs_hook, numbers=numbers, large_string_threshold=large_string_threshold, string_hook=string_hook, dedupe=dedupe, max_depth=max_depth, max_elements=max_elements, max_string_length=max_string_length, max_bytes=max_bytes, forbid_dtd=forbid_dtd, workers=workers)
+
+
+def loads_many(docs, *, object_hook=None, parse_float=None, parse_int=None, parse_constant=None, object_pairs_hook=None, numbers='eager', large_string_threshold=None, string_hook=None, dedupe=False, max_depth=None, max_elements=None, max_string_length=None, max_bytes=None, forbid_dtd=False, workers=None):
+    """
+    Deserialize a batch of JSONx documents to Python objects in a thread pool.
+
+    Every document is deserialized by its own handler and parser, and the
+    deserializer has no shared mutable state, thus it is safe to run in
+    threads, and it scales with the number of threads on free-threaded Python
+    builds. (However, the hook functions are called from the threads, too.)
+
+    :param docs: Strings (or UTF-8 encoded bytes) to be deserialized.
+    :param int workers: Number of threads. (Default: the number of CPUs on
+        free-threaded Python builds, 1 otherwise, in which case the documents
+        are deserialized one after the other in the calling thread)
+
+    The other keyword arguments have the same meaning as in :func:`load`.
+
+    :return: The values deserialized, in the order of the documents.
+    :rtype: list
+    """
+
+    kwargs = {'object_hook': object_hook, 'parse_float': parse_float, 'parse_int': parse_int, 'parse_constant': parse_constant, 'object_pairs_hook': object_pairs_hook, 'numbers': numbers, 'large_string_threshold': large_string_threshold, 'string_hook': string_hook, 'dedupe': dedupe, 'max_depth': max_depth, 'max_elements': max_elements, 'max_string_length': max_string_length, 'max_bytes': max_bytes, 'forbid_dtd': forbid_dtd}
+    return thread_map(lambda doc: load(StringIO(doc) if isinstance(doc, str) else BytesIO(doc), **kwargs), docs, workers)
+
+
+class _ExpatLocator:
+    """
+    SAX locator for a bare expat parser.
+    """
+
+    def __init__(self, parser):
+        self._parser = parser
+
+    def getLineNumber(self):
+        return self._parser.CurrentLineNumber
+
+    def getColumnNumber(self):
+        return self._parser.CurrentColumnNumber
+
+
+class _DocumentEnd(Exception):
+    """
+    Raised from the end element handler of the root element to stop the parser
+    at the end of a document.
+    """
+
+
+class JSONxPushDecoder:  # pylint: disable=too-many-instance-attributes
+    """
+    Incremental decoder that deserializes JSONx documents from a stream of
+    bytes pushed to it in arbitrary fragments, e.g., as they are received from
+    a network connection. The stream may consist of several concatenated
+    documents (optionally separated by whitespace, comments, or processing
+    instructions), and every document is deserialized as soon as its root
+    element is complete. After an error, decoding restarts with the next
+    fragment, as if it started a new stream, and the values of the documents
+    that the erroneous fragment completed before the error are not lost, but
+    returned by the next call to :meth:`feed` or :meth:`close`.
+
+    The documents must be encoded in UTF-8 (or in another ASCII-compatible
+    encoding). Line and column numbers in error messages are relative to the
+    start of the document being deserialized.
+
+    The keyword arguments have the same meaning as in :func:`load`.
+    """
+
+    def __init__(self, *, object_hook=None, parse_float=None, parse_int=None, parse_constant=None, object_pairs_hook=None, numbers='eager', large_string_threshold=None, string_hook=None, dedupe=False, max_depth=None, max_elements=None, max_string_length=None, forbid_dtd=False):
+        self._kwargs = {'object_hook': object_hook, 'parse_float': parse_float, 'parse_int': parse_int, 'parse_constant': parse_constant, 'object_pairs_hook': object_pairs_hook, 'numbers': numbers, 'large_string_threshold': large_string_threshold, 'string_hook': string_hook, 'dedupe': dedupe, 'max_depth': max_depth, 'max_elements': max_elements, 'max_string_length': max_string_length, 'forbid_dtd': forbid_dtd}
+        self._parser = None  # Parser of the current document, if it has started.
+        self._handler = None
+        # The received bytes that may still be needed, and the stream positions
+        # of their start and of the end of the bytes fed to the parser of the
+        # current document.
+        self._buffer = bytearray()
+        self._base = 0
+        self._fed = 0
+        self._nested = False  # Whether the root element has child elements.
+        self._end = None  # Stream position of the end event of the root element.
+        self._completed = []  # Values completed by a fragment that failed.
+
+    def feed(self, data):
+        """
+        Parse the next fragment of the stream.
+
+        :param bytes data: Fragment to be parsed.
+        :return: The values deserialized from the documents completed by the
+            fragment (in the order of the documents).
+        :rtype: list
+        :raises ValueError: If the stream is not a sequence of valid JSONx
+            documents.
+        """
+        return self._feed(data, False)
+
+    def close(self):
+        """
+        Signal the end of the stream.
+
+        :return: The values deserialized from the documents completed at the
+            end of the stream (as for :meth:`feed`).
+        :rtype: list
+        :raises ValueError: If the stream ends within a document.
+        """
+        return self._feed(b'', True)
+
+    def _feed(self, data, final):
+        values, self._completed = self._completed, []
+        self._buffer += data
+        while True:
+            if self._parser is None:
+                # Whitespace, comments, and processing instructions between
+                # documents must not reach the parser, as the XML declaration
+                # must be at the very start of a document.
+                if not self._skip_misc(final):
+                    break
+                self._start()
+
+            # The parser copies the data it is fed, thus it is fed slices of
+            # growing size, so that the data after the end of a short document
+            # is not copied over and over again.
+            size = _PUSH_SLICE_SIZE
+            try:
+                while self._fed < self._base + len(self._buffer):
+                    end = min(self._fed + size, self._base + len(self._buffer))
+                    with memoryview(self._buffer)[self._fed - self._base:end - self._base] as piece:
+                        self._parser.Parse(piece, False)
+                    self._fed = end
+                    size *= 2
+                    self._trim()
+                if final:
+                    self._parser.Parse(b'', True)
+            except _DocumentEnd:
+                values.append(self._handler.stack[0].value)
+                self._discard(self._document_end())
+                self._reset()
+                continue
+            except ExpatError as e:
+                self._fail(values)
+                raise ValueError(f'{ErrorString(e.code)} [line {e.lineno}, column {e.offset}]') from e
+            except Exception:
+                self._fail(values)
+                raise
+
+            if final:
+                self._reset()
+            break
+        return values
+
+    def _skip_misc(self, final):
+        # Skip the whitespace, comments, and processing instructions at the
+        # start of the data, but keep an incomplete one (or what may be the
+        # start of one) pending until more data arrives.
+        pos = 0
+        while match := _MISC_RE.match(self._buffer, pos):
+            pos = match.end()
+        self._discard(self._base + _WHITESPACE_RE.match(self._buffer, pos).end())
+
+        if not self._buffer:
+            return False
+        if not final:
+            pi = _PI_START_RE.match(self._buffer)
+            if b'<!--'.startswith(self._buffer[:4]) or (pi and (pi.end() == len(self._buffer) or pi.group(1) != b'xml')):
+                return False
+        return True
+
+    def _trim(self):
+        # Keep only those of the bytes fed to the parser that the end of the
+        # document may have to be found in, i.e., the last tag if it is
+        # incomplete (as the events of tags are reported when they are
+        # complete), but no text or complete markup.
+        fed = self._fed - self._base
+        lt = self._buffer.rfind(b'<', 0, fed)
+        if lt >= 0 and not _TAG_RE.match(self._buffer, lt, fed):
+            self._discard(self._base + lt)
+        else:
+            self._discard(self._fed)
+
+    def _discard(self, pos):
+        # Discard the buffered bytes before a stream position.
+        del self._buffer[:pos - self._base]
+        self._base = pos
+
+    def _fail(self, values):
+        # Decoding restarts with the next fragment, but the values completed
+        # before the error are kept.
+        self._discard(self._base + len(self._buffer))
+        self._reset()
+        self._completed = values
+
+    def _reset(self):
+        self._parser = None
+        self._handler = None
+
+    def _document_end(self):
+        # The end event of an element is reported at the start of its end tag,
+        # but at the end of an empty-element tag (which is the only way for
+        # the start tag of an element without child elements to end in '/>').
+        end = self._end - self._base
+        if not self._nested and self._buffer[end - 2:end] == b'/>':
+            return self._end
+        return self._base + self._buffer.index(b'>', end) + 1
+
+    def _start(self):
+        handler = JSONxHandler(**self._kwargs)
+        parser = ParserCreate(namespace_separator=' ')
+        parser.buffer_text = True
+        handler.setDocumentLocator(_ExpatLocator(parser))
+        origin = self._base  # Stream position of the start of the document.
+
+        def start_element(name, attrs):
+            if len(handler.stack) > 1:
+                self._nested = True
+            uri, _, localname = name.rpartition(' ')
+            if not uri:
+                handler.startElement(name, attrs)
+            handler.startElementNS((uri, localname), None, {(None, 'name'): attrs['name']} if 'name' in attrs else {})
+
+        def end_element(name):
+            uri, _, localname = name.rpartition(' ')
+            handler.endElementNS((uri, localname), None)
+            if len(handler.stack) == 1:
+                self._end = origin + parser.CurrentByteIndex
+                raise _DocumentEnd()
+
+        parser.StartElementHandler = start_element
+        parser.EndElementHandler = end_element
+        parser.CharacterDataHandler = handler.characters
+        if handler.forbid_dtd:
+            parser.StartDoctypeDeclHandler = lambda name, system_id, public_id, _has_internal_subset: handler.startDTD(name, public_id, system_id)
+
+        self._parser = parser
+        self._handler = handler
+        self._fed = origin
+        self._nested = False
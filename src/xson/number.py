@@ -0,0 +1,137 @@
+# Copyright (c) 2026 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import math
+import operator
+import re
+import sys
+
+
+# Lexemes in floating point format that are integers (which may still be
+# rejected by int() if they have too many digits).
+_INT_LEXEME_RE = re.compile(r'[+-]?[\d_]+')
+
+
+def _unwrap(value):
+    return value.value if isinstance(value, JSONxNumber) else value
+
+
+class JSONxNumber:
+    """
+    Number that keeps its lexeme (i.e., the text content of a number element)
+    and converts it to :class:`int` (or to :class:`float`, if it is not an
+    integer) only when its value is first used. Lazy numbers support the
+    arithmetic and comparison operators of their values, and they are
+    serialized by :func:`xson.dump` with their lexemes copied verbatim.
+
+    :param str lexeme: Text of the number in floating point format (surrounding
+        whitespace is stripped). Validating the lexeme takes time linear in its
+        length, even if it is a very long integer.
+    :raises ValueError: If the lexeme is not in floating point format.
+    """
+
+    __slots__ = ('lexeme', '_value')
+
+    def __init__(self, lexeme):
+        lexeme = lexeme.strip()
+        float(lexeme)
+        self.lexeme = lexeme
+        self._value = None
+
+    @property
+    def value(self):
+        """
+        The value of the number, converted from the lexeme on first use.
+
+        :raises ValueError: If the lexeme is an integer with more digits than
+            the limit of the interpreter (see
+            :func:`sys.set_int_max_str_digits`), in which case only
+            :attr:`lexeme` is available.
+        """
+        value = self._value
+        if value is None:
+            try:
+                value = int(self.lexeme)
+            except ValueError as e:
+                if _INT_LEXEME_RE.fullmatch(self.lexeme):
+                    raise ValueError(f'integer has more digits than the limit of {sys.get_int_max_str_digits()}, use the lexeme attribute or sys.set_int_max_str_digits() instead') from e
+                value = float(self.lexeme)
+            self._value = value
+        return value
+
+    def __reduce__(self):
+        return JSONxNumber, (self.lexeme,)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.lexeme!r})'
+
+    def __str__(self):
+        return self.lexeme
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def __bool__(self):
+        return bool(self.value)
+
+    def __int__(self):
+        return int(self.value)
+
+    def __float__(self):
+        return float(self.value)
+
+    def __complex__(self):
+        return complex(self.value)
+
+    def __index__(self):
+        return operator.index(self.value)
+
+    def __round__(self, ndigits=None):
+        return round(self.value, ndigits)
+
+    def __trunc__(self):
+        return math.trunc(self.value)
+
+    def __floor__(self):
+        return math.floor(self.value)
+
+    def __ceil__(self):
+        return math.ceil(self.value)
+
+    def __format__(self, format_spec):
+        if not format_spec:
+            return str(self)
+        return format(self.value, format_spec)
+
+    def __invert__(self):
+        return ~self.value
+
+    def __neg__(self):
+        return -self.value
+
+    def __pos__(self):
+        return +self.value
+
+    def __abs__(self):
+        return abs(self.value)
+
+
+def _operator(op, reflected=False):
+    if reflected:
+        return lambda self, other: op(_unwrap(other), self.value)
+    return lambda self, other: op(self.value, _unwrap(other))
+
+
+# Binary operators (with their reflected variants) and comparisons are applied
+# to the values of the numbers.
+for _op in (operator.add, operator.sub, operator.mul, operator.truediv, operator.floordiv, operator.mod, operator.pow, divmod, operator.and_, operator.or_, operator.xor, operator.lshift, operator.rshift):
+    _name = _op.__name__.rstrip('_')
+    setattr(JSONxNumber, f'__{_name}__', _operator(_op))
+    setattr(JSONxNumber, f'__r{_name}__', _operator(_op, reflected=True))
+
+for _op in (operator.eq, operator.ne, operator.lt, operator.le, operator.gt, operator.ge):
+    setattr(JSONxNumber, f'__{_op.__name__}__', _operator(_op))
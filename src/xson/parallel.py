@@ -0,0 +1,53 @@
+# Copyright (c) 2026 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import os
+import sys
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+def _gil_enabled():
+    return getattr(sys, '_is_gil_enabled', lambda: True)()
+
+
+def executor(workers):
+    """
+    Create a worker pool for running the serializer or the deserializer in
+    parallel. Threads can only run them in parallel on free-threaded Python
+    builds, otherwise processes are needed.
+    """
+    executor_cls = ProcessPoolExecutor if _gil_enabled() else ThreadPoolExecutor
+    return executor_cls(max_workers=workers)
+
+
+def _map_chunk(fn, chunk):
+    return [fn(item) for item in chunk]
+
+
+def thread_map(fn, items, workers):
+    """
+    Apply a function to items in a thread pool, and return the results in the
+    order of the items. The items are passed to the threads in contiguous
+    chunks to amortize the overhead of the pool. If the number of workers is
+    not specified, then it defaults to the number of CPUs on free-threaded
+    Python builds, and to 1 (i.e., no pool at all) otherwise, as threads
+    cannot run the serializer or the deserializer in parallel then.
+    """
+    items = list(items)
+    if workers is None:
+        workers = 1 if _gil_enabled() else os.cpu_count() or 1
+    if workers <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+
+    chunk_size = -(-len(items) // (workers * 4))
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    results = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for chunk_results in pool.map(_map_chunk, [fn] * len(chunks), chunks):
+            results.extend(chunk_results)
+    return results
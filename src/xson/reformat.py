@@ -0,0 +1,171 @@
+# Copyright (c) 2026 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+from xml.parsers.expat import ErrorString, ExpatError, ParserCreate
+
+from .dump import _attrs, _text_writer, _XML_DECLARATION, _XMLNS_ATTRS
+from .load import _decompressed
+from .pkgdata import JSONX_NS_URI, JSONX_PREFIX
+
+
+_PREFIX = f'{JSONX_PREFIX}:'
+
+
+class JSONxReformatter:
+    """
+    Expat-based parser that validates a JSONx document and writes it out again
+    formatted the same way as :func:`xson.dump` would, without decoding it into
+    Python objects (and without the overhead of the SAX interface).
+
+    The stack holds the local name, the rendered attributes of the start tag,
+    and the state of the open elements. The state of a container element is
+    ``None`` until its start tag is written (i.e., until its first child starts,
+    or it turns out to be empty); if keys are sorted, then the state of an
+    object element is the list of its members as key and output fragments
+    pairs. The state of other elements is the list of their text fragments.
+    """
+
+    def __init__(self, write, indent=None, sort_keys=False):
+        if indent is not None:
+            if isinstance(indent, int):
+                indent = ' ' * indent if indent > 0 else ''
+            self._newline = '\n'
+        else:
+            indent = ''
+            self._newline = ''
+        self._indent = indent
+        self._indents = ['']
+        self._sort_keys = sort_keys
+        self._writes = [write]  # The last one is the current writer.
+        self._stack = [['root', None, None]]
+
+        self._parser = ParserCreate(namespace_separator=' ')
+        self._parser.buffer_text = True
+        self._parser.StartElementHandler = self._start_element
+        self._parser.EndElementHandler = self._end_element
+        self._parser.CharacterDataHandler = self._character_data
+
+        write(_XML_DECLARATION)
+
+    def parse(self, fp):
+        try:
+            while data := fp.read(65536):
+                self._parser.Parse(data, False)
+            self._parser.Parse(data, True)
+        except ExpatError as e:
+            raise ValueError(f'{ErrorString(e.code)} [line {e.lineno}, column {e.offset}]') from e
+
+        assert len(self._stack) == 1
+
+    def _start_element(self, name, attrs):
+        uri, _, localname = name.rpartition(' ')
+        if uri != JSONX_NS_URI:
+            self._expect(False, f'unsupported namespace URI {uri}' if uri else f'unsupported non-namespaced element {name}')
+
+        stack = self._stack
+        container = stack[-1]
+        container_localname = container[0]
+        if container_localname == 'object':
+            key = attrs.get('name')
+            self._expect(key is not None, 'element within an object element must have a name attribute')
+            element_attrs = _attrs(key)
+        elif container_localname == 'root':
+            element_attrs = _XMLNS_ATTRS
+        else:
+            self._expect(container_localname == 'array', f'{container_localname} element cannot contain other elements')
+            element_attrs = ''
+
+        level = len(stack) - 1
+        if len(self._indents) == level:
+            self._indents.append(self._indents[-1] + self._indent)
+
+        if container[2] is None and container_localname != 'root':
+            self._writes[-1](f'{self._indents[level - 1]}<{_PREFIX}{container_localname}{container[1]}>{self._newline}')
+            container[2] = True
+
+        if container_localname == 'object' and self._sort_keys:
+            if container[2] is True:
+                container[2] = []
+            fragments = []
+            container[2].append((key, fragments))
+            self._writes.append(fragments.append)
+
+        if localname in ('string', 'number', 'boolean'):
+            stack.append([localname, element_attrs, []])
+        elif localname in ('object', 'array', 'null'):
+            stack.append([localname, element_attrs, None])
+        else:
+            self._expect(False, f'unsupported element {localname}')
+
+    def _end_element(self, _name):
+        stack = self._stack
+        localname, element_attrs, value = stack.pop()
+
+        write = self._writes[-1]
+        ind = self._indents[len(stack) - 1]
+        if value is None:
+            write(f'{ind}<{_PREFIX}{localname}{element_attrs}/>{self._newline}')
+        elif localname in ('object', 'array'):
+            if value is not True:
+                for _, fragments in sorted(value, key=lambda member: member[0]):
+                    write(''.join(fragments))
+            write(f'{ind}</{_PREFIX}{localname}>{self._newline}')
+        else:
+            value = ''.join(value)
+            if localname == 'string':
+                value = value.replace('&', '&amp;').replace('>', '&gt;').replace('<', '&lt;')
+            elif localname == 'number':
+                # Only check that the number is valid, but copy its lexeme.
+                try:
+                    float(value)
+                except ValueError:
+                    self._expect(False, 'number element must contain text content in floating point format')
+                value = value.strip()
+            elif value not in ('true', 'false'):
+                self._expect(False, 'boolean element must contain either true or false text content')
+
+            if value:
+                write(f'{ind}<{_PREFIX}{localname}{element_attrs}>{value}</{_PREFIX}{localname}>{self._newline}')
+            else:
+                write(f'{ind}<{_PREFIX}{localname}{element_attrs}/>{self._newline}')
+
+        if self._sort_keys and stack[-1][0] == 'object':
+            self._writes.pop()
+
+    def _character_data(self, data):
+        localname, _, value = self._stack[-1]
+        if localname in ('string', 'number', 'boolean'):
+            value.append(data)
+        elif not data.isspace():
+            self._expect(False, f'{localname} element must not have non-whitespace character content {data}')
+
+    def _expect(self, expr, msg):
+        if not expr:
+            raise ValueError(f'{msg} [line {self._parser.CurrentLineNumber}, column {self._parser.CurrentColumnNumber}]')
+
+
+def reformat(fp, out, *, indent=None, sort_keys=False):
+    """
+    Re-format a JSONx file, i.e., validate it and write it out again with the
+    formatting options of :func:`dump`, without deserializing it to Python
+    objects. The text of numbers is copied as is (whitespace apart), and
+    objects keep all their members, even if their names are duplicated.
+
+    :param fp: File-like object to be re-formatted (may be compressed, as for
+        :func:`load`).
+    :param out: File-like object to write JSONx to (as for :func:`dump`).
+
+    The keyword arguments have the same meaning as in :func:`dump`.
+
+    :raises ValueError: If the data being re-formatted is not a valid JSONx
+        document.
+    """
+
+    out = _text_writer(out)
+
+    JSONxReformatter(out.write, indent=indent, sort_keys=sort_keys).parse(_decompressed(fp))
+    out.flush()
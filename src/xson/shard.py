@@ -0,0 +1,277 @@
+# Copyright (c) 2026 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+from contextlib import ExitStack
+from io import BytesIO
+from xml.parsers.expat import ErrorString, ExpatError, ParserCreate
+
+from .dump import _dump_chunk, _XML_DECLARATION
+from .load import _decompressed, _MARKUP_RE, load
+from .pkgdata import JSONX_NS_URI
+
+
+_ELEMENTS = ('object', 'array', 'string', 'number', 'boolean', 'null')
+
+
+class JSONxArrayReader:  # pylint: disable=too-many-instance-attributes
+    """
+    Expat-based reader of the items of the root array of a JSONx document that
+    yields the bytes of the items as they appear in the document, without
+    deserializing them, and keeps only the bytes of the current item (and of
+    the current block of input) in memory. The items are only checked to be
+    well-formed elements of the JSONx namespace.
+
+    Once the root element has started, ``root_tag`` is its start tag (with the
+    namespace declarations), ``root_name`` is its qualified name, and
+    ``encoding`` is the encoding declared by the document (if any).
+    """
+
+    def __init__(self, fp, block_size=65536):
+        self.root_tag = None
+        self.root_name = None
+        self.encoding = None
+        self._fp = _decompressed(fp)
+        self._block_size = block_size
+        self._data = bytearray()  # Input from byte index _base on.
+        self._base = 0
+        self._depth = 0
+        self._start = None  # Byte index of the start of the current item.
+        self._touched = False  # Whether the current item has content.
+        self._gap = None  # Byte index of the end of the last item.
+        self._items = []
+
+        self._parser = ParserCreate(namespace_separator=' ')
+        self._parser.XmlDeclHandler = self._xml_decl
+        self._parser.StartDoctypeDeclHandler = self._start_doctype_decl
+        self._parser.StartElementHandler = self._start_element
+        self._parser.EndElementHandler = self._end_element
+        self._parser.CharacterDataHandler = self._character_data
+        self._parser.CommentHandler = self._touch
+        self._parser.ProcessingInstructionHandler = self._touch
+
+    @property
+    def utf8(self):
+        """
+        Whether the document is encoded in UTF-8.
+        """
+        return self.encoding is None or self.encoding.lower() in ('utf-8', 'utf8')
+
+    def items(self):
+        """
+        Parse the document and yield its items.
+
+        :return: Iterator over the bytes of the items, paired with the
+            whitespace that indents them on their lines (or ``None`` if they do
+            not start on a new line).
+        :raises ValueError: If the document is not well-formed, or if its root
+            element is not a JSONx array element.
+        """
+        while True:
+            block = self._fp.read(self._block_size)
+            if not self._base and not self._data and block[:2] in (b'\xfe\xff', b'\xff\xfe'):
+                raise ValueError('document must be encoded in an ASCII-compatible encoding')
+            self._data += block
+            try:
+                self._parser.Parse(block, not block)
+            except ExpatError as e:
+                raise ValueError(f'{ErrorString(e.code)} [line {e.lineno}, column {e.offset}]') from e
+
+            yield from self._items
+            self._items.clear()
+
+            keep = self._start if self._start is not None else self._gap
+            if keep is not None:
+                del self._data[:keep - self._base]
+                self._base = keep
+
+            if not block:
+                break
+
+    def _xml_decl(self, _version, encoding, _standalone):
+        self.encoding = encoding
+
+    def _start_doctype_decl(self, *_args):
+        self._expect(False, 'document type declarations are not supported')
+
+    def _start_element(self, name, _attrs):
+        uri, _, localname = name.rpartition(' ')
+        index = self._parser.CurrentByteIndex
+        if self._depth == 0:
+            self._expect(uri == JSONX_NS_URI and localname == 'array', 'root element must be an array element')
+            match = _MARKUP_RE[bytes].match(self._data, index - self._base)
+            self.root_tag = bytes(match.group(0))
+            self.root_name = bytes(match.group(2))
+            if match.group(3):
+                self.root_tag = self.root_tag[:-2] + b'>'
+            self._gap = index + len(match.group(0))
+        elif self._depth == 1:
+            self._expect(uri == JSONX_NS_URI and localname in _ELEMENTS, f'unsupported element {localname}')
+            self._start = index
+            self._touched = False
+        else:
+            self._touched = True
+        self._depth += 1
+
+    def _end_element(self, _name):
+        self._depth -= 1
+        if self._depth != 1:
+            self._touched = True
+            return
+
+        data = self._data
+        start = self._start - self._base
+        end = self._parser.CurrentByteIndex - self._base
+        # The end event of an empty-element tag is reported after the tag, that
+        # of an end tag at its start.
+        if self._touched or data[end - 2:end] != b'/>':
+            end = data.index(b'>', end) + 1
+
+        gap = data[self._gap - self._base:start]
+        newline = gap.rfind(b'\n')
+        indent = bytes(gap[newline + 1:]) if newline >= 0 else None
+        if indent is not None and indent.strip():
+            # Something else than whitespace precedes the item on its line.
+            indent = None
+        self._items.append((bytes(data[start:end]), indent))
+        self._gap = end + self._base
+        self._start = None
+
+    def _character_data(self, data):
+        if self._depth > 1:
+            self._touched = True
+        elif not data.isspace():
+            self._expect(False, f'array element must not have non-whitespace character content {data}')
+
+    def _touch(self, *_args):
+        self._touched = True
+
+    def _expect(self, expr, msg):
+        if not expr:
+            raise ValueError(f'{msg} [line {self._parser.CurrentLineNumber}, column {self._parser.CurrentColumnNumber}]')
+
+
+class _ArrayLayout:
+    """
+    Layout of an output array: its root start and end tags, and the indentation
+    of its items. Items of documents with the same root start tag, encoding,
+    and indentation are copied verbatim, others are deserialized and serialized
+    again (with lazy numbers, so that the text of numbers is kept).
+    """
+
+    def __init__(self, root_tag, root_name, indent):
+        newline = b'\n' if indent is not None else b''
+        prefix, colon, _ = root_name.rpartition(b':')
+        self.root_tag = root_tag
+        self.indent = indent
+        self.head = _XML_DECLARATION.encode('utf-8') + root_tag + newline
+        self.tail = b'</' + root_name + b'>' + newline
+        self._dump_kwargs = {'skipkeys': False, 'check_circular': True, 'allow_nan': True, 'indent': indent.decode('utf-8') if indent is not None else None, 'default': None, 'sort_keys': False, 'slots': False, 'encoders': None, 'prefix': prefix.decode('utf-8') if colon else None, 'xml_declaration': False}
+
+    def render(self, item, indent, reader):
+        if reader.utf8 and reader.root_tag == self.root_tag and indent == self.indent:
+            return self.indent + item + b'\n' if indent is not None else item
+
+        doc = f'<?xml version="1.0" encoding="{reader.encoding or "UTF-8"}"?>'.encode('ascii') + reader.root_tag + item + b'</' + reader.root_name + b'>'
+        return _dump_chunk(load(BytesIO(doc), numbers='lazy'), self._dump_kwargs).encode('utf-8', 'xmlcharrefreplace')
+
+
+def split_array(fp, open_shard, *, max_items=None, max_bytes=None):
+    """
+    Split the root array of a JSONx file into shards, i.e., into JSONx files
+    with root arrays of consecutive items, streaming the items from the input
+    to the shards. The items are copied verbatim (re-indenting them only if
+    they are indented inconsistently).
+
+    :param fp: Binary file-like object to be split (may be compressed, as for
+        :func:`load`).
+    :param open_shard: Function that gets called with the index of every shard
+        (starting at 0), and must return a binary file-like object (that is
+        also a context manager) to write the shard to.
+    :param int max_items: If specified, then shards do not contain more than
+        this many items. (Default: ``None``)
+    :param int max_bytes: If specified, then shards are not larger than this
+        many bytes, unless they consist of a single item only.
+        (Default: ``None``)
+    :return: The number of shards written (at least one, which may be empty).
+    :rtype: int
+    :raises ValueError: If neither limit is specified, or if the input is not
+        a well-formed JSONx document with an array root element.
+    """
+
+    if max_items is None and max_bytes is None:
+        raise ValueError('either max_items or max_bytes must be specified')
+
+    reader = JSONxArrayReader(fp)
+    layout = None
+    shards = size = count = 0
+    with ExitStack() as stack:
+        out = None
+        for item, indent in reader.items():
+            if layout is None:
+                layout = _ArrayLayout(reader.root_tag, reader.root_name, indent)
+            fragment = layout.render(item, indent, reader)
+
+            if out is not None and ((max_items is not None and count >= max_items) or (max_bytes is not None and size + len(fragment) + len(layout.tail) > max_bytes)):
+                out.write(layout.tail)
+                stack.close()
+                out = None
+            if out is None:
+                out = stack.enter_context(open_shard(shards))
+                shards += 1
+                out.write(layout.head)
+                size, count = len(layout.head), 0
+
+            out.write(fragment)
+            size += len(fragment)
+            count += 1
+
+        if out is None:
+            layout = _ArrayLayout(reader.root_tag, reader.root_name, None)
+            out = stack.enter_context(open_shard(shards))
+            shards += 1
+            out.write(layout.head)
+        out.write(layout.tail)
+    return shards
+
+
+def merge_arrays(fps, out):
+    """
+    Merge the root arrays of JSONx files into one, streaming the items from the
+    inputs to the output. The output has the root element of the first input,
+    and the items are copied verbatim (except for the items of inputs with
+    different namespace declarations, encoding, or indentation, which are
+    deserialized and serialized again).
+
+    :param fps: Binary file-like objects to be merged (may be compressed, as
+        for :func:`load`).
+    :param out: Binary file-like object to write JSONx to.
+    :return: The number of items written.
+    :rtype: int
+    :raises ValueError: If an input is not a well-formed JSONx document with an
+        array root element.
+    """
+
+    first = None
+    layout = None
+    count = 0
+    for fp in fps:
+        reader = JSONxArrayReader(fp)
+        first = first or reader
+        for item, indent in reader.items():
+            if layout is None:
+                layout = _ArrayLayout(first.root_tag, first.root_name, indent)
+                out.write(layout.head)
+            out.write(layout.render(item, indent, reader))
+            count += 1
+
+    if first is None:
+        raise ValueError('at least one file must be merged')
+    if layout is None:
+        layout = _ArrayLayout(first.root_tag, first.root_name, None)
+        out.write(layout.head)
+    out.write(layout.tail)
+    return count
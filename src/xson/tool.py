@@ -1,33 +1,125 @@
-# Copyright (c) 2021-2025 Renata Hodovan, Akos Kiss.
+# Copyright (c) 2021-2026 Renata Hodovan, Akos Kiss.
 #
 # Licensed under the BSD 3-Clause License
 # <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
 # This file may not be copied, modified, or distributed except
 # according to those terms.
 
+import os
+import shutil
 import sys
 
 from argparse import ArgumentParser
 from contextlib import contextmanager
 from json import dump as json_dump, load as json_load
+from tempfile import TemporaryFile
 
+from .compress import COMPRESSIONS, detect_compression, open_compressed
 from .dump import dump as xson_dump
 from .load import load as xson_load
+from .reformat import reformat as xson_reformat
+from .shard import merge_arrays, split_array
 
 
 @contextmanager
-def open_with_default(file, mode, encoding, default):
+def open_with_default(file, mode, default, compression='auto'):
     if file:
-        with open(file, mode, encoding=encoding) as f:
+        with open_compressed(file, mode, compression=compression) as f:
             yield f
     else:
-        yield default
+        if compression == 'auto':
+            compression = detect_compression(default.buffer) if mode.startswith('r') else None
+        if compression:
+            with open_compressed(default.buffer, mode, compression=compression) as f:
+                yield f
+        else:
+            yield default
+
+
+def default_shard_pattern(infile):
+    if not infile:
+        return 'shard-{:04d}.jsonx'
+    root, ext = os.path.splitext(infile)
+    if any(ext == c_ext for _, _, c_ext in COMPRESSIONS.values()):
+        root, inner_ext = os.path.splitext(root)
+        ext = inner_ext + ext
+    return root.replace('{', '{{').replace('}', '}}') + '-{:04d}' + ext
+
+
+def execute_split(argv):
+    parser = ArgumentParser(prog='xson-tool split', description='''
+        Split the root array of a JSONx file into shards with root arrays of
+        consecutive items, streaming the items and copying them verbatim.
+    ''')
+
+    parser.add_argument('infile', nargs='?',
+                        help='input file to be split (default: stdin)')
+    parser.add_argument('-o', '--outfile', metavar='PATTERN',
+                        help='write the shards to files named by PATTERN, with {} replaced by the index of the shard, '
+                             'which may be formatted, e.g., as {:04d} (default: infile with -{:04d} inserted before its extension)')
+    parser.add_argument('--max-items', metavar='N', type=int,
+                        help='write at most N items to a shard')
+    parser.add_argument('--max-bytes', metavar='B', type=int,
+                        help='write at most B bytes (uncompressed) to a shard, unless it consists of a single item')
+    parser.add_argument('--compress', metavar='METHOD', choices=[*COMPRESSIONS, 'none'], default='auto',
+                        help='compress shards with METHOD (gzip, bz2, xz, or none; default: detect from the extension of PATTERN)')
+
+    args = parser.parse_args(argv)
+    if args.max_items is None and args.max_bytes is None:
+        parser.error('either --max-items or --max-bytes is required')
+
+    pattern = args.outfile or default_shard_pattern(args.infile)
+    compression = None if args.compress == 'none' else args.compress
+
+    # Shards are streamed as bytes, thus stdin is read from its binary buffer.
+    with open_with_default(args.infile, 'rb', default=sys.stdin) as infile:
+        split_array(getattr(infile, 'buffer', infile), lambda index: open_compressed(pattern.format(index), 'wb', compression=compression),
+                    max_items=args.max_items, max_bytes=args.max_bytes)
+
+
+def execute_merge(argv):
+    parser = ArgumentParser(prog='xson-tool merge', description='''
+        Merge the root arrays of JSONx files into one, streaming the items and
+        copying them verbatim.
+    ''')
+
+    parser.add_argument('infiles', nargs='+', metavar='infile',
+                        help='input file to be merged')
+    parser.add_argument('-o', '--outfile',
+                        help='write the merged array to outfile (default: stdout)')
+    parser.add_argument('--compress', metavar='METHOD', choices=[*COMPRESSIONS, 'none'], default='auto',
+                        help='compress output with METHOD (gzip, bz2, xz, or none; default: detect from the extension of outfile)')
+
+    args = parser.parse_args(argv)
+
+    compression = None if args.compress == 'none' else args.compress
+
+    # The input files are opened one after the other, when their turn comes.
+    def infiles():
+        for infile in args.infiles:
+            f = open_compressed(infile, 'rb')
+            try:
+                yield f
+            finally:
+                f.close()
+
+    with open_with_default(args.outfile, 'wb', default=sys.stdout, compression=compression) as outfile:
+        merge_arrays(infiles(), getattr(outfile, 'buffer', outfile))
 
 
 def execute():
+    commands = {'split': execute_split, 'merge': execute_merge}
+    if len(sys.argv) > 1 and sys.argv[1] in commands:
+        commands[sys.argv[1]](sys.argv[2:])
+        return
+
     parser = ArgumentParser(description='''
         A simple command line interface for the xson module to validate,
         pretty-print, and convert between JSONx and JSON objects.
+    ''', epilog='''
+        Use the split and merge commands (see xson-tool split --help and
+        xson-tool merge --help) to split large JSONx arrays into shards and to
+        merge them.
     ''')
 
     parser.add_argument('infile', nargs='?',
@@ -49,15 +141,38 @@ def execute():
                         help='read input as JSON rather than JSONx')
     parser.add_argument('-J', '--outfile-json', action='store_true',
                         help='write output as JSON rather than JSONx')
+    parser.add_argument('--compress', metavar='METHOD', choices=[*COMPRESSIONS, 'none'], default='auto',
+                        help='compress output with METHOD (gzip, bz2, xz, or none; default: detect from the extension of outfile)')
 
     args = parser.parse_args()
 
     load = json_load if args.infile_json else xson_load
     dump = json_dump if args.outfile_json else xson_dump
 
-    with open_with_default(args.infile, 'r', encoding='utf-8', default=sys.stdin) as infile:
+    compression = None if args.compress == 'none' else args.compress
+
+    # JSONx to JSONx is re-formatted directly, without deserializing the input.
+    # The output is written to a temporary file first, and outfile is only
+    # overwritten if the input is valid (which also allows infile and outfile
+    # to be the same file).
+    if not args.infile_json and not args.outfile_json:
+        if not args.outfile:
+            with open_with_default(args.infile, 'rb', default=sys.stdin) as infile, \
+                 open_with_default(args.outfile, 'wb', default=sys.stdout, compression=compression) as outfile:
+                xson_reformat(infile, outfile, sort_keys=args.sort_keys, indent=args.indent)
+            return
+
+        with TemporaryFile() as tmpfile:
+            with open_with_default(args.infile, 'rb', default=sys.stdin) as infile:
+                xson_reformat(infile, tmpfile, sort_keys=args.sort_keys, indent=args.indent)
+            tmpfile.seek(0)
+            with open_with_default(args.outfile, 'wb', default=sys.stdout, compression=compression) as outfile:
+                shutil.copyfileobj(tmpfile, outfile)
+        return
+
+    with open_with_default(args.infile, 'rb', default=sys.stdin) as infile:
         obj = load(infile)
-    with open_with_default(args.outfile, 'w', encoding='utf-8', default=sys.stdout) as outfile:
+    with open_with_default(args.outfile, 'wt' if args.outfile_json else 'wb', default=sys.stdout, compression=compression) as outfile:
         dump(obj, outfile, sort_keys=args.sort_keys, indent=args.indent)
 
 
@@ -0,0 +1,144 @@
+# Copyright (c) 2026 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import os
+
+from decimal import Decimal
+
+import pytest
+
+import xson
+
+
+val_config = {'name': 'foo', 'limits': [1, 2.5, None, True], 'nested': {'a': {'b': []}}}
+
+
+def write_jsonx(fn, val, mtime_ns=None):
+    with open(fn, 'w', encoding='utf-8') as f:
+        xson.dump(val, f)
+    if mtime_ns is not None:
+        os.utime(fn, ns=(mtime_ns, mtime_ns))
+
+
+def stats(loader):
+    return loader.hits, loader.snapshot_hits, loader.misses
+
+
+def test_cached_loader(tmpdir):
+    fn = os.path.join(str(tmpdir), 'config.jsonx')
+    write_jsonx(fn, val_config, mtime_ns=10**18)
+
+    loader = xson.CachedLoader()
+    val = loader.load(fn)
+    assert val == val_config
+    assert loader.load(fn) is val
+    assert stats(loader) == (1, 0, 1)
+
+    # Changes of the modification time or of the size invalidate the cache.
+    os.utime(fn, ns=(10**18 + 1, 10**18 + 1))
+    assert loader.load(fn) == val_config
+    write_jsonx(fn, {'changed': True}, mtime_ns=10**18 + 1)
+    assert loader.load(fn) == {'changed': True}
+    assert stats(loader) == (1, 0, 3)
+
+    loader.clear()
+    assert stats(loader) == (0, 0, 0)
+    assert loader.load(fn) == {'changed': True}
+    assert stats(loader) == (0, 0, 1)
+
+
+def test_cached_loader_maxsize(tmpdir):
+    fns = [os.path.join(str(tmpdir), f'{i}.jsonx') for i in range(3)]
+    for i, fn in enumerate(fns):
+        write_jsonx(fn, i)
+
+    loader = xson.CachedLoader(maxsize=2)
+    assert [loader.load(fn) for fn in fns] == [0, 1, 2]
+    assert [loader.load(fn) for fn in reversed(fns)] == [2, 1, 0]
+    assert stats(loader) == (2, 0, 4)
+
+
+@pytest.mark.parametrize('kw, exp', [
+    ({}, val_config),
+    ({'parse_float': Decimal, 'snapshot_key': 'decimal'}, {'name': 'foo', 'limits': [1, Decimal('2.5'), None, True], 'nested': {'a': {'b': []}}}),
+    ({'object_pairs_hook': tuple, 'dedupe': True, 'snapshot_key': 'tuple'}, (('name', 'foo'), ('limits', [1, 2.5, None, True]), ('nested', (('a', (('b', []),)),)))),
+])
+def test_cached_loader_snapshot(kw, exp, tmpdir):
+    fn = os.path.join(str(tmpdir), 'config.jsonx')
+    snapshot_dir = os.path.join(str(tmpdir), 'snapshots')
+    write_jsonx(fn, val_config, mtime_ns=10**18)
+
+    loader = xson.CachedLoader(snapshot_dir=snapshot_dir, **kw)
+    assert loader.load(fn) == exp
+    assert stats(loader) == (0, 0, 1)
+    assert len(os.listdir(snapshot_dir)) == 1
+
+    loader = xson.CachedLoader(snapshot_dir=snapshot_dir, **kw)
+    assert loader.load(fn) == exp
+    assert stats(loader) == (0, 1, 0)
+
+    # The snapshot is used as long as the size and the modification time of
+    # the file are unchanged, even if its content is not, as the file is not
+    # parsed at all.
+    write_jsonx(fn, {'name': 'bar', 'limits': [1, 2.5, None, True], 'nested': {'a': {'b': []}}}, mtime_ns=10**18)
+    assert xson.CachedLoader(snapshot_dir=snapshot_dir, **kw).load(fn) == exp
+
+    os.utime(fn, ns=(10**18 + 1, 10**18 + 1))
+    loader = xson.CachedLoader(snapshot_dir=snapshot_dir, **kw)
+    assert loader.load(fn) != exp
+    assert stats(loader) == (0, 0, 1)
+
+    # Snapshots are specific to the options.
+    loader = xson.CachedLoader(snapshot_dir=snapshot_dir, parse_int=str, snapshot_key='str')
+    assert loader.load(fn)
+    assert stats(loader) == (0, 0, 1)
+
+
+def test_cached_loader_snapshot_hooks(tmpdir):
+    fn = os.path.join(str(tmpdir), 'config.jsonx')
+    snapshot_dir = os.path.join(str(tmpdir), 'snapshots')
+    write_jsonx(fn, {'a': 1})
+
+    # Hooks without a snapshot key are never snapshotted, as they cannot be
+    # told apart.
+    assert xson.CachedLoader(snapshot_dir=snapshot_dir, object_hook=lambda o: ('A', o)).load(fn) == ('A', {'a': 1})
+    assert xson.CachedLoader(snapshot_dir=snapshot_dir, object_hook=lambda o: ('B', o)).load(fn) == ('B', {'a': 1})
+    assert not os.path.exists(snapshot_dir)
+
+    # Snapshots are specific to the snapshot key.
+    for key, tag in [('a', 'A'), ('b', 'B'), ('a', 'C')]:
+        loader = xson.CachedLoader(snapshot_dir=snapshot_dir, snapshot_key=key, object_hook=lambda o, tag=tag: (tag, o))
+        assert loader.load(fn) == ('A' if key == 'a' else 'B', {'a': 1})
+    assert len(os.listdir(snapshot_dir)) == 2
+
+
+def test_cached_loader_corrupt_snapshot(tmpdir):
+    fn = os.path.join(str(tmpdir), 'config.jsonx')
+    snapshot_dir = os.path.join(str(tmpdir), 'snapshots')
+    write_jsonx(fn, val_config)
+
+    xson.CachedLoader(snapshot_dir=snapshot_dir).load(fn)
+    snapshot_fn = os.path.join(snapshot_dir, os.listdir(snapshot_dir)[0])
+    with open(snapshot_fn, 'r+b') as f:
+        f.truncate(os.path.getsize(snapshot_fn) - 5)
+
+    loader = xson.CachedLoader(snapshot_dir=snapshot_dir)
+    assert loader.load(fn) == val_config
+    assert stats(loader) == (0, 0, 1)
+    assert xson.CachedLoader(snapshot_dir=snapshot_dir).load(fn) == val_config
+
+
+def test_cached_loader_error(tmpdir):
+    fn = os.path.join(str(tmpdir), 'config.jsonx')
+    with open(fn, 'w', encoding='utf-8') as f:
+        f.write('<json:null xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx">')
+
+    loader = xson.CachedLoader(snapshot_dir=os.path.join(str(tmpdir), 'snapshots'))
+    with pytest.raises(ValueError):
+        loader.load(fn)
+    with pytest.raises(FileNotFoundError):
+        loader.load(os.path.join(str(tmpdir), 'missing.jsonx'))
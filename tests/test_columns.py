@@ -0,0 +1,93 @@
+# Copyright (c) 2026 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+from array import array
+from io import BytesIO, StringIO
+from math import isnan
+
+import pytest
+
+import xson
+
+
+val_records = [
+    {'id': 1, 'name': 'foo', 'ratio': 0.5, 'ok': True},
+    {'id': 2, 'ratio': 1, 'ok': False, 'tags': ['a', 'b']},
+    {'ok': None, 'ratio': -1.5, 'id': 3, 'name': 'baz', 'name ': ''},
+]
+# Expected array columns are given as pairs of type codes and items, and NaNs
+# as 'nan' strings.
+exp_columns_null = {
+    'id': ('q', [1, 2, 3]),
+    'name': ['foo', None, 'baz'],
+    'ratio': ('d', [0.5, 1.0, -1.5]),
+    'ok': [True, False, None],
+    'tags': [None, ['a', 'b'], None],
+    'name ': [None, None, ''],
+}
+
+
+@pytest.mark.parametrize('val, kw, exp', [
+    (val_records, {}, exp_columns_null),
+    ({'meta': {'rows': [{'x': 0}]}, 'data': [[], {'rows': val_records}]}, {'path': ('data', 1, 'rows')}, exp_columns_null),
+    ({'rows': [{'x': 0}], 'data': {'rows': val_records}}, {'path': ['data', 'rows']}, exp_columns_null),
+    (val_records, {'missing': 'nan'}, {
+        'id': ('q', [1, 2, 3]),
+        'name': ['foo', 'nan', 'baz'],
+        'ratio': ('d', [0.5, 1.0, -1.5]),
+        'ok': [True, False, None],
+        'tags': ['nan', ['a', 'b'], 'nan'],
+        'name ': ['nan', 'nan', ''],
+    }),
+    ([{'a': 1}, {}, {'a': 2**70}, {'a': 3, 'a ': 4}], {}, {'a': [1, None, 2**70, 3], 'a ': [None, None, None, 4]}),
+    ([{'a': 1}, {'b': 2}], {'missing': 'nan'}, {'a': ('d', [1.0, 'nan']), 'b': ('d', ['nan', 2.0])}),
+    ([{'a': '1', 'b': 2.5}], {'parse_float': str}, {'a': ['1'], 'b': ['2.5']}),
+    ([], {}, {}),
+])
+def test_load_columns(val, kw, exp):
+    inp = xson.dumps(val, indent=2)
+    for fp in (StringIO(inp), BytesIO(inp.encode('utf-8'))):
+        columns = xson.load_columns(fp, numpy=False, **kw)
+        assert list(columns) == list(exp)
+        for key, column in columns.items():
+            if isinstance(exp[key], tuple):
+                assert isinstance(column, array) and column.typecode == exp[key][0]
+                exp_column = exp[key][1]
+            else:
+                assert isinstance(column, list)
+                exp_column = exp[key]
+            assert [str(v) if isinstance(v, float) and isnan(v) else v for v in column] == exp_column
+
+
+def test_load_columns_duplicate():
+    inp = xson.dumps([{'a': 1, 'b': 2}, {'a': 3, 'b': 4}]).replace('"b">2', '"a">2')
+    columns = xson.load_columns(StringIO(inp), missing='nan', numpy=False)
+    assert columns['a'] == array('q', [2, 3])
+    assert columns['b'][1] == 4 and isnan(columns['b'][0])
+
+
+@pytest.mark.parametrize('val, kw', [
+    (val_records, {'missing': 'error'}),
+    (val_records, {'path': ['rows']}),
+    ({'rows': val_records}, {'path': ['data']}),
+    ({'rows': val_records}, {'path': ['rows', 0]}),
+    ({'rows': 'foo'}, {'path': ['rows']}),
+    ({'rows': [{}, []]}, {'path': ['rows']}),
+    (val_records, {'missing': 'foo'}),
+])
+def test_load_columns_error(val, kw):
+    with pytest.raises(ValueError):
+        xson.load_columns(StringIO(xson.dumps(val)), numpy=False, **kw)
+
+
+def test_load_columns_numpy():
+    numpy = pytest.importorskip('numpy')
+
+    columns = xson.load_columns(StringIO(xson.dumps(val_records)), numpy=True)
+    assert isinstance(columns['id'], numpy.ndarray) and columns['id'].dtype == numpy.int64
+    assert isinstance(columns['ratio'], numpy.ndarray) and columns['ratio'].dtype == numpy.float64
+    assert columns['name'] == exp_columns_null['name']
@@ -0,0 +1,65 @@
+# Copyright (c) 2026 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+import bz2
+import gzip
+import lzma
+import os
+
+from io import BytesIO
+
+import pytest
+
+import xson
+
+
+val = {'foo': 42, 'bar': [3.14, 'baz' * 1000, True, None]}
+
+
+@pytest.mark.parametrize('ext, decompress', [
+    ('.gz', gzip.decompress),
+    ('.bz2', bz2.decompress),
+    ('.xz', lzma.decompress),
+    ('.jsonx', bytes),
+])
+def test_compress_path(ext, decompress, tmpdir):
+    tmpfn = os.path.join(str(tmpdir), f'tmp{ext}')
+    with xson.open_compressed(tmpfn, 'wb') as f:
+        xson.dump(val, f)
+    with open(tmpfn, 'rb') as f:
+        assert decompress(f.read()) == xson.dumpb(val)
+
+    with xson.open_compressed(tmpfn) as f:
+        assert xson.load(f) == val
+    with open(tmpfn, 'rb') as f:
+        assert xson.load(f) == val
+    with open(tmpfn, 'rb') as f:
+        assert xson.load(f, workers=2) == val
+
+
+@pytest.mark.parametrize('compression, compress', [
+    ('gzip', gzip.compress),
+    ('bz2', bz2.compress),
+    ('xz', lzma.compress),
+    (None, bytes),
+])
+def test_compress_stream(compression, compress):
+    out = BytesIO()
+    f = xson.open_compressed(out, 'wb', compression=compression)
+    xson.dump(val, f)
+    if f is not out:
+        f.close()
+    assert xson.load(BytesIO(out.getvalue())) == val
+    assert xson.load(BytesIO(compress(xson.dumpb(val)))) == val
+    assert xson.loads(xson.open_compressed(BytesIO(compress(xson.dumpb(val))), 'rt').read()) == val
+
+
+def test_compress_error():
+    with pytest.raises(ValueError):
+        xson.open_compressed(BytesIO(), 'wb', compression='zip')
+    with pytest.raises(ValueError):
+        xson.open_compressed(BytesIO(), 'a')
@@ -1,14 +1,24 @@
-# Copyright (c) 2019-2023 Renata Hodovan, Akos Kiss.
+# Copyright (c) 2019-2026 Renata Hodovan, Akos Kiss.
 #
 # Licensed under the BSD 3-Clause License
 # <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
 # This file may not be copied, modified, or distributed except
 # according to those terms.
 
+import gc
+import hashlib
+import mmap
 import os
+import sys
+import weakref
 
 from collections import OrderedDict
+from dataclasses import dataclass, field, make_dataclass
+from decimal import Decimal
+from enum import Enum, IntEnum
+from io import BytesIO
 from math import inf, nan
+from tempfile import SpooledTemporaryFile
 
 import pytest
 
@@ -96,6 +106,10 @@ exp_tuple_default = '''
 <?xml version="1.0" encoding="UTF-8"?>
 <json:array xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx"><json:number>1</json:number><json:number>2</json:number></json:array>
 '''
+exp_tuple_str = '''
+<?xml version="1.0" encoding="UTF-8"?>
+<json:string xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx">(1, 2)</json:string>
+'''
 
 
 def tuple_default(val):
@@ -121,6 +135,70 @@ exp_ordereddict_mixedkeys = '''
 '''
 
 
+@dataclass
+class Point:
+    y: int
+    x: int
+    tags: list = field(default_factory=list)
+
+
+val_dataclass = [Point(2, 1, ['a']), Point(4, 3)]
+exp_dataclass = '''
+<?xml version="1.0" encoding="UTF-8"?>
+<json:array xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx"><json:object><json:number name="y">2</json:number><json:number name="x">1</json:number><json:array name="tags"><json:string>a</json:string></json:array></json:object><json:object><json:number name="y">4</json:number><json:number name="x">3</json:number><json:array name="tags"/></json:object></json:array>
+'''
+exp_dataclass_sortkeys = '''
+<?xml version="1.0" encoding="UTF-8"?>
+<json:array xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx"><json:object><json:array name="tags"><json:string>a</json:string></json:array><json:number name="x">1</json:number><json:number name="y">2</json:number></json:object><json:object><json:array name="tags"/><json:number name="x">3</json:number><json:number name="y">4</json:number></json:object></json:array>
+'''
+
+
+class SlotsBase:
+    __slots__ = ('a',)
+
+
+class Slots(SlotsBase):
+    __slots__ = ('b', 'c')
+
+    def __init__(self, a, b):
+        self.a = a
+        self.b = b
+
+
+val_slots = Slots('x', None)
+exp_slots = '''
+<?xml version="1.0" encoding="UTF-8"?>
+<json:object xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx"><json:string name="a">x</json:string><json:null name="b"/></json:object>
+'''
+
+
+class Color(IntEnum):
+    RED = 1
+
+
+class MyDecimal(Decimal):
+    pass
+
+
+class Key(str, Enum):
+    A = 'a'
+
+
+# Keys of str subclasses are rendered with str(), as are other non-str keys.
+val_strenum_keys = [{Key.A: 1}, {Key.A: 2}, {Key.A: 3}]
+exp_strenum_keys = '''
+<?xml version="1.0" encoding="UTF-8"?>
+<json:array xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx"><json:object><json:number name="Key.A">1</json:number></json:object><json:object><json:number name="Key.A">2</json:number></json:object><json:object><json:number name="Key.A">3</json:number></json:object></json:array>
+'''
+
+
+val_encoders = [Decimal('1.10'), MyDecimal('2.5'), Color.RED, (3, 4)]
+exp_encoders = '''
+<?xml version="1.0" encoding="UTF-8"?>
+<json:array xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx"><json:string>1.10</json:string><json:string>2.5</json:string><json:number>1</json:number><json:array><json:number>3</json:number><json:number>4</json:number></json:array></json:array>
+'''
+
+
 @pytest.mark.parametrize('val, kw, exp', [
     # skipkeys (default: False)
     (val_tuplekey, {}, TypeError),
@@ -172,11 +250,30 @@ exp_ordereddict_mixedkeys = '''
     (val_ordereddict_mixedkeys, {}, exp_ordereddict_mixedkeys),
     (val_ordereddict_mixedkeys, {'sort_keys': False}, exp_ordereddict_mixedkeys),
     (val_ordereddict_mixedkeys, {'sort_keys': True}, TypeError),
+    (val_strenum_keys, {}, exp_strenum_keys),
+    (val_strenum_keys, {'sort_keys': True}, exp_strenum_keys),
+    (val_dataclass, {'sort_keys': True}, exp_dataclass_sortkeys),
+    # dataclasses
+    (val_dataclass, {}, exp_dataclass),
+    # slots (default: False)
+    (val_slots, {}, TypeError),
+    (val_slots, {'slots': False}, TypeError),
+    (val_slots, {'slots': True}, exp_slots),
+    # encoders (default: None)
+    (val_encoders, {}, TypeError),
+    (val_encoders, {'encoders': None}, TypeError),
+    (val_encoders, {'encoders': {Decimal: str}}, TypeError),
+    (val_encoders, {'encoders': {Decimal: str, tuple: list}}, exp_encoders),
+    (val_encoders, {'encoders': {Decimal: str}, 'default': tuple_default}, exp_encoders),
+    (val_tuple, {'encoders': {tuple: str}, 'default': tuple_default}, exp_tuple_str),
 ])
 def test_dump(val, kw, exp, tmpdir):
     def _dumps():
         return xson.dumps(val, **kw)
 
+    def _dumpb():
+        return xson.dumpb(val, **kw).decode('utf-8')
+
     def _dump():
         tmpfn = os.path.join(str(tmpdir), 'tmp.jsonx')
         with open(tmpfn, 'w', encoding='utf-8') as tmpf:
@@ -184,10 +281,351 @@ def test_dump(val, kw, exp, tmpdir):
         with open(tmpfn, 'r', encoding='utf-8') as tmpf:
             return tmpf.read()
 
-    for dump in (_dumps, _dump):
+    def _dump_binary():
+        tmpfn = os.path.join(str(tmpdir), 'tmp.jsonx')
+        with open(tmpfn, 'wb') as tmpf:
+            xson.dump(val, tmpf, **kw)
+        with open(tmpfn, 'r', encoding='utf-8') as tmpf:
+            return tmpf.read()
+
+    for dump in (_dumps, _dumpb, _dump, _dump_binary):
         if isinstance(exp, type):
             with pytest.raises(exp):
                 dump()
         else:
             out = dump()
             assert out.strip() == exp.strip()
+
+
+def test_dump_binary_writer():
+    # Binary file objects get the UTF-8 encoding of the output, as they did
+    # when dump was based on XMLGenerator.
+    b = BytesIO()
+    xson.dump(val_dataclass, b)
+    assert b.getvalue() == xson.dumps(val_dataclass).encode('utf-8')
+
+
+class BytesSink:
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        assert isinstance(data, bytes)
+        self.chunks.append(data)
+
+
+def test_dump_binary_duck_writer():
+    sink = BytesSink()
+    xson.dump(val_dataclass, sink)
+    assert b''.join(sink.chunks) == xson.dumpb(val_dataclass)
+
+
+def test_dump_spooled_temporary_file():
+    with SpooledTemporaryFile() as f:
+        xson.dump(val_dataclass, f)
+        f.seek(0)
+        assert f.read() == xson.dumpb(val_dataclass)
+
+
+@pytest.mark.parametrize('val', [
+    'árvíztűrő tükörfúrógép ' * 10000,
+    {'long': ['x' * 1000] * 1000, 'unicode': 'árvíztűrő <&>'},
+])
+def test_dumpb(val):
+    assert xson.dumpb(val, indent=1) == xson.dumps(val, indent=1).encode('utf-8')
+
+
+@pytest.mark.parametrize('val', [
+    val_dict_list,
+    val_ordereddict,
+    {'long': ['x' * 1000] * 1000, 'unicode': 'árvíztűrő <&>'},
+])
+@pytest.mark.parametrize('algorithm', ['sha256', 'md5', hashlib.sha1])
+def test_digest(val, algorithm):
+    h = hashlib.new(algorithm) if isinstance(algorithm, str) else algorithm()
+    h.update(xson.dumps(val, sort_keys=True).encode('utf-8'))
+    assert xson.digest(val, algorithm).hexdigest() == h.hexdigest()
+
+
+val_large_list = [{'id': i, 'name': f'item <{i}>', 'tags': [i % 3, None, True], 'ratio': i / 7} for i in range(3000)]
+val_large_dict = {str(3000 - i): [i, (i, i)] for i in range(3000)}
+val_large_dict[(1, 2)] = 3
+
+
+@pytest.mark.parametrize('val, kw', [
+    (val_large_list, {}),
+    (val_large_list, {'indent': 2}),
+    (val_large_list, {'indent': ''}),
+    (val_large_dict, {'skipkeys': True, 'default': tuple_default}),
+    ({str(i): (i, i) for i in range(3000)}, {'default': tuple_default, 'sort_keys': True, 'indent': '\t'}),
+    ({(i, i): i for i in range(2000)}, {'skipkeys': True}),
+    ({(i, i): i for i in range(2000)}, {'skipkeys': True, 'indent': 1}),
+])
+def test_dump_workers(val, kw):
+    assert xson.dumps(val, workers=3, **kw) == xson.dumps(val, **kw)
+    assert xson.dumpb(val, workers=3, **kw) == xson.dumpb(val, **kw)
+
+
+@pytest.mark.parametrize('val, kw, exp', [
+    (val_large_dict, {}, TypeError),
+    (val_large_dict, {'skipkeys': True}, TypeError),
+])
+def test_dump_workers_error(val, kw, exp):
+    with pytest.raises(exp):
+        xson.dumps(val, workers=3, **kw)
+
+
+def test_dump_deep():
+    depth = 100000
+    val = []
+    for _ in range(depth):
+        val = [val, {'a': None}]
+
+    out = xson.dumps(val)
+    assert out.count('<json:array>') == depth - 1
+    assert out.count('<json:object><json:null name="a"/></json:object>') == depth
+    assert out.endswith('<json:array/>' + '<json:object><json:null name="a"/></json:object></json:array>' * depth)
+
+    out = xson.dumps(val[0][0][0][0], indent='')
+    assert out.count('\n') == 1 + 5 * (depth - 4) + 1
+
+    with pytest.raises(RecursionError):
+        xson.dumps(val, check_circular=False)
+
+
+class Node:
+    def __init__(self, child):
+        self.child = child
+
+
+@dataclass
+class Wrapper:
+    child: object
+
+
+def _chain(depth):
+    val = None
+    for _ in range(depth):
+        val = Node(val)
+    return val
+
+
+def _node_dict(node):
+    return {'child': node.child} if node.child is not None else {'leaf': 1}
+
+
+def _node_dataclass(node):
+    return Wrapper(node.child) if node.child is not None else Wrapper(1)
+
+
+@pytest.mark.parametrize('kw, leaf', [
+    ({'default': _node_dict}, 'leaf'),
+    ({'encoders': {Node: _node_dict}}, 'leaf'),
+    ({'default': _node_dataclass}, 'child'),
+    ({'encoders': {Node: _node_dataclass}}, 'child'),
+])
+def test_dump_fresh_containers(kw, leaf):
+    # Fresh containers returned by conversion functions must not be mistaken
+    # for circular references, even if they are freed and their identities
+    # are reused.
+    out = xson.dumps(_chain(50), **kw)
+    assert '<json:object name="child">' * 49 + f'<json:number name="{leaf}">1</json:number>' in out
+    assert out.count('</json:object>') == 50
+
+
+@pytest.mark.parametrize('val, kw', [
+    (object(), {'default': lambda o: o}),
+    (1.5, {'encoders': {float: lambda f: f}}),
+    (Decimal(1), {'encoders': {Decimal: lambda d: d + 1}}),
+])
+def test_dump_conversion_loop(val, kw):
+    with pytest.raises(RecursionError):
+        xson.dumps(val, **kw)
+
+
+@pytest.mark.parametrize('val', [
+    val_dict_list,
+    val_large_list,
+    [0.0, -0.0, 0, False, 1, 1.0, True, Color.RED, 'RED', Color.RED, 1, '1', 1],
+    {'a': 'x' * 300, 'b': ['x' * 300] * 3, 'x' * 300: 'x' * 300, 'c': 'a', 'd': {'a': 'a'}},
+])
+@pytest.mark.parametrize('maxsize', [1, 2, 4096])
+def test_dump_cache(val, maxsize):
+    cache = xson.FragmentCache(maxsize=maxsize)
+    for kw in ({}, {'indent': 2}, {'sort_keys': True}, {'prefix': None}, {'prefix': 'j'}, {}):
+        assert xson.dumps(val, cache=cache, **kw) == xson.dumps(val, **kw)
+        assert len(cache) <= maxsize
+    assert xson.digest(val, cache=cache).hexdigest() == xson.digest(val).hexdigest()
+
+
+def test_dump_cache_stats():
+    cache = xson.FragmentCache()
+    assert cache.hit_rate == 0.0
+
+    xson.dumps([{'a': 'x', 'b': 1.5}, {'a': 'x', 'b': 2.5}, {'a': 'y', 'c': None}], cache=cache)
+    # Names a, b, a, b, a, c and values (a, x), (a, x), (a, y).
+    assert (cache.hits, cache.misses, len(cache)) == (4, 5, 5)
+    assert cache.hit_rate == 4 / 9
+
+    cache.clear()
+    assert (cache.hits, cache.misses, len(cache)) == (0, 0, 0)
+
+
+@pytest.mark.parametrize('kw', [
+    {},
+    {'indent': 2, 'sort_keys': True},
+    {'slots': True, 'encoders': {Decimal: str}, 'default': tuple_default},
+])
+def test_dumps_many(kw):
+    # Classes are created for every test run, so that their encoding plans are
+    # first computed concurrently.
+    classes = [make_dataclass(f'Record{i}', [('id', int), ('name', str)]) for i in range(50)]
+    vals = [[classes[i % 50](i, f'item <{i}>'), {'z': Decimal(i), 'a': (i, None)} if 'encoders' in kw else {'z': i, 'a': [i, None]}, val_large_list[i]] for i in range(1000)]
+
+    # Make threads switch as often as possible to expose races on builds with
+    # the GIL, too.
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        out = xson.dumps_many(vals, workers=8, **kw)
+        exp = [xson.dumps(val, **kw) for val in vals]
+        assert out == exp
+        for workers in (None, 1, 8):
+            for _ in range(3):
+                assert xson.dumps_many(vals, workers=workers, **kw) == exp
+    finally:
+        sys.setswitchinterval(interval)
+
+
+def test_dumps_many_error():
+    with pytest.raises(TypeError):
+        xson.dumps_many([[i] for i in range(100)] + [object()], workers=8)
+
+
+@pytest.mark.parametrize('val, kw, exp', [
+    ([1, {'a': None}], {'prefix': None}, '''
+<?xml version="1.0" encoding="UTF-8"?>
+<array xmlns="http://www.ibm.com/xmlns/prod/2009/jsonx"><number>1</number><object><null name="a"/></object></array>
+'''),
+    ([1, {'a': None}], {'prefix': None, 'xml_declaration': False}, '''
+<array xmlns="http://www.ibm.com/xmlns/prod/2009/jsonx"><number>1</number><object><null name="a"/></object></array>
+'''),
+    ('foo', {'prefix': 'j', 'xml_declaration': False}, '''
+<j:string xmlns:j="http://www.ibm.com/xmlns/prod/2009/jsonx">foo</j:string>
+'''),
+    (None, {'prefix': '_j-1.x', 'xml_declaration': False}, '''
+<_j-1.x:null xmlns:_j-1.x="http://www.ibm.com/xmlns/prod/2009/jsonx"/>
+'''),
+    ([[]], {'prefix': None, 'indent': 1}, '''
+<?xml version="1.0" encoding="UTF-8"?>
+<array xmlns="http://www.ibm.com/xmlns/prod/2009/jsonx">
+ <array/>
+</array>
+'''),
+])
+def test_dump_prefix(val, kw, exp):
+    out = xson.dumps(val, **kw)
+    assert out == exp.strip() + ('\n' if 'indent' in kw else '')
+    assert xson.loads(out) == val
+
+
+@pytest.mark.parametrize('prefix', ['', 'a:b', '1x', 'a b', '<', 'xml', 'xmlns', b'json'])
+def test_dump_prefix_error(prefix):
+    with pytest.raises(ValueError):
+        xson.dumps([1], prefix=prefix)
+    with pytest.raises(ValueError):
+        xson.dumps(val_large_list, prefix=prefix, workers=3)
+
+
+@pytest.mark.parametrize('kw', [
+    {'prefix': None},
+    {'prefix': None, 'xml_declaration': False, 'indent': 2},
+    {'prefix': 'x', 'xml_declaration': False},
+])
+def test_dump_prefix_workers(kw):
+    exp = xson.dumps(val_large_list, **kw)
+    assert xson.dumps(val_large_list, workers=3, **kw) == exp
+    assert xson.loads(exp, workers=3) == xson.loads(exp) == xson.loads(xson.dumps(val_large_list))
+    assert len(xson.dumps(val_large_list, prefix=None, xml_declaration=False)) < 0.8 * len(xson.dumps(val_large_list))
+
+
+@pytest.mark.parametrize('val', [
+    None,
+    'árvíztűrő tükörfúrógép <&> \ud800',
+    val_large_list,
+])
+@pytest.mark.parametrize('kw', [
+    {},
+    {'indent': 2, 'sort_keys': True},
+    {'prefix': None, 'xml_declaration': False},
+    {'workers': 3},
+])
+def test_dump_into(val, kw):
+    exp = xson.dumpb(val, **kw)
+    assert xson.encoded_size(val, **kw) == len(exp)
+
+    buffer = bytearray(len(exp))
+    assert xson.dump_into(val, buffer, **kw) == len(exp)
+    assert buffer == exp
+
+    with mmap.mmap(-1, len(exp) + 10) as buffer:
+        assert xson.dump_into(val, memoryview(buffer)[5:], 2, **kw) == len(exp)
+        assert buffer[:7] == b'\0' * 7
+        assert buffer[7:7 + len(exp)] == exp
+        assert buffer[7 + len(exp):] == b'\0' * 3
+
+
+def test_dump_into_error():
+    with pytest.raises(ValueError):
+        xson.dump_into(val_large_list, bytearray(xson.encoded_size(val_large_list) - 1))
+    with pytest.raises(ValueError):
+        xson.dump_into(None, bytearray(100), 100)
+
+    for offset in (-150, -1, 201):
+        buffer = bytearray(200)
+        with pytest.raises(ValueError, match='offset'):
+            xson.dump_into(None, buffer, offset)
+        assert buffer == bytearray(200)
+
+
+val_shapes = [
+    *[{'b': i, 'a': [{'y': i, 'x': None}] * 2} for i in range(5)],
+    {'a': 1}, {'b': 2}, {'a': 3}, {'b': 4}, {'a': 5},
+    {1: 'int'}, {True: 'bool'}, {1: 'int'}, {True: 'bool'}, {(1, 2): 'tuple'}, {(1, 2): 'tuple'},
+    *[{'b': {}, 'a': {}}] * 3,
+    *[{f'k{i}': i} for i in range(300)] * 2,
+]
+
+
+@pytest.mark.parametrize('kw', [
+    {},
+    {'indent': 2},
+    {'sort_keys': True},
+    {'sort_keys': True, 'indent': 2, 'cache': xson.FragmentCache()},
+])
+def test_dump_shapes(kw):
+    # Every row serialized on its own is encoded without templates.
+    out = xson.dumps(val_shapes, skipkeys=True, **kw)
+    newline = '\n' if 'indent' in kw else ''
+    head = f'<?xml version="1.0" encoding="UTF-8"?>\n<json:array xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx">{newline}'
+    tail = f'</json:array>{newline}'
+    rows = [xson.dumps([row], skipkeys=True, **kw) for row in val_shapes]
+    assert out == head + ''.join(row[len(head):-len(tail)] for row in rows) + tail
+
+
+@pytest.mark.parametrize('lexeme', ['NaN', '-Infinity', 'inf'])
+def test_dump_lazy_number_allow_nan(lexeme):
+    assert xson.dumps(xson.JSONxNumber(lexeme), xml_declaration=False) == f'<json:number xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx">{lexeme}</json:number>'
+    with pytest.raises(ValueError):
+        xson.dumps(xson.JSONxNumber(lexeme), allow_nan=False)
+
+
+def test_dump_fields_plan_release():
+    cls = make_dataclass('Transient', [('id', int)])
+    assert xson.dumps(cls(1), xml_declaration=False) == '<json:object xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx"><json:number name="id">1</json:number></json:object>'
+
+    # The encoding plan of the class must not keep it alive.
+    ref = weakref.ref(cls)
+    del cls
+    gc.collect()
+    assert ref() is None
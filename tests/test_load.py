@@ -1,13 +1,18 @@
-# Copyright (c) 2019-2023 Renata Hodovan, Akos Kiss.
+# Copyright (c) 2019-2026 Renata Hodovan, Akos Kiss.
 #
 # Licensed under the BSD 3-Clause License
 # <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
 # This file may not be copied, modified, or distributed except
 # according to those terms.
 
+import math
 import os
+import sys
+import tracemalloc
 
+from decimal import Decimal
 from math import inf, isnan, nan
+from xml.parsers.expat import ParserCreate
 
 import pytest
 
@@ -135,3 +140,473 @@ def test_load(inp, kw, exp, tmpdir):
                 assert isinstance(exp, float) and isnan(exp)
             else:
                 assert val == exp
+
+
+inp_large_array = '''
+<?xml version="1.0" encoding="UTF-8"?>
+<!-- comment with <json:object> and > characters -->
+<json:array xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx">
+''' + ''.join(f'''
+    <json:object>
+        <json:string name="a&gt;b">x > y {i}</json:string>
+        <json:string name='q"/>'><![CDATA[<json:null/></json:array>]]></json:string>
+        <!-- </json:object> -->
+        <json:array name="n"><json:number>{i}</json:number><json:null/></json:array>
+        <json:object name="e"/>
+    </json:object>
+    <json:number>{i / 4}</json:number>
+    <?pi </json:array> ?>''' for i in range(1500)) + '''
+</json:array>
+<!-- trailing comment -->
+'''
+
+
+@pytest.mark.parametrize('inp, kw', [
+    (inp_large_array, {}),
+    (inp_large_array, {'object_hook': tuple_object_hook}),
+    (inp_large_array, {'parse_int': parse_int_str}),
+    (inp_tuple, {}),
+], ids=['default', 'object_hook', 'parse_int', 'small'])
+def test_load_workers(inp, kw, tmpdir):
+    exp = xson.loads(inp.strip(), **kw)
+    assert xson.loads(inp.strip(), workers=3, **kw) == exp
+
+    tmpfn = os.path.join(str(tmpdir), 'tmp.jsonx')
+    with open(tmpfn, 'w', encoding='utf-8') as tmpf:
+        tmpf.write(inp.strip())
+    for mode, encoding in (('r', 'utf-8'), ('rb', None)):
+        with open(tmpfn, mode, encoding=encoding) as tmpf:
+            assert xson.load(tmpf, workers=3, **kw) == exp
+
+
+@pytest.mark.parametrize('inp', [
+    inp_large_array.replace('<json:object name="e"/>', '<json:object name="e">x</json:object>', 1),
+    inp_large_array.replace('</json:number>', '</json:string>', 1),
+    inp_large_array + '<json:null/>',
+], ids=['content', 'mismatch', 'trailing'])
+def test_load_workers_error(inp):
+    with pytest.raises(ValueError):
+        xson.loads(inp.strip(), workers=3)
+
+
+inp_large_string = '''
+<?xml version="1.0" encoding="UTF-8"?>
+<json:object xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx">
+    <json:string name="small">foo</json:string>
+    <json:string name="large">''' + 'x &amp; y &#13;\n' * 10000 + '''</json:string>
+    <json:array name="array">
+        <json:string>''' + 'z' * 17 + '''</json:string>
+        <json:string>''' + 'z' * 16 + '''</json:string>
+    </json:array>
+</json:object>
+'''
+
+
+def read_string_hook(f):
+    with f:
+        return ('read', f.read())
+
+
+def test_load_large_string():
+    exp = xson.loads(inp_large_string.strip())
+
+    val = xson.loads(inp_large_string.strip(), large_string_threshold=16)
+    assert val['small'] == exp['small']
+    assert val['array'][1] == exp['array'][1]
+    for spilled, exp_spilled in ((val['large'], exp['large']), (val['array'][0], exp['array'][0])):
+        assert not isinstance(spilled, str)
+        with spilled:
+            assert spilled.read() == exp_spilled
+
+    val = xson.loads(inp_large_string.strip(), large_string_threshold=16, string_hook=read_string_hook)
+    assert val == {'small': exp['small'], 'large': ('read', exp['large']), 'array': [('read', exp['array'][0]), exp['array'][1]]}
+
+    assert xson.loads(inp_large_string.strip(), string_hook=read_string_hook) == exp
+
+
+def test_load_large_string_many():
+    resource = pytest.importorskip('resource')
+
+    # More spilled strings than file descriptors available.
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(256, hard), hard))
+    try:
+        val = xson.loads(xson.dumps([f'{i} ' + 'x' * 100 for i in range(1000)]), large_string_threshold=50)
+    finally:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+
+    assert [f.read() for f in reversed(val)] == [f'{i} ' + 'x' * 100 for i in reversed(range(1000))]
+    assert val[0].seek(0) == 0 and val[0].read(3) == '0 x'
+    for f in val:
+        f.close()
+
+
+inp_limits = '''
+<?xml version="1.0" encoding="UTF-8"?>
+<json:array xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx">
+    <json:object>
+        <json:string name="s">foo</json:string>
+        <json:number name="n">1234</json:number>
+    </json:object>
+    <json:null/>
+</json:array>
+'''
+inp_dtd = '''
+<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE json:null [
+    <!ENTITY a "aaaaaaaaaa">
+]>
+<json:null xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx"/>
+'''
+
+
+@pytest.mark.parametrize('inp, kw, exceeded', [
+    (inp_limits, {'max_depth': 3}, False),
+    (inp_limits, {'max_depth': 2}, True),
+    (inp_limits, {'max_elements': 5}, False),
+    (inp_limits, {'max_elements': 4}, True),
+    (inp_limits, {'max_string_length': 4}, False),
+    (inp_limits, {'max_string_length': 3}, True),
+    (inp_limits, {'max_string_length': 3, 'large_string_threshold': 1}, True),
+    (inp_limits, {'max_bytes': len(inp_limits.strip())}, False),
+    (inp_limits, {'max_bytes': len(inp_limits.strip()) - 1}, True),
+    (inp_dtd, {}, False),
+    (inp_dtd, {'forbid_dtd': True}, True),
+], ids=['max_depth', 'max_depth_exceeded', 'max_elements', 'max_elements_exceeded', 'max_string_length', 'max_string_length_exceeded', 'max_string_length_spilled', 'max_bytes', 'max_bytes_exceeded', 'dtd', 'forbid_dtd'])
+def test_load_limits(inp, kw, exceeded, tmpdir):
+    tmpfn = os.path.join(str(tmpdir), 'tmp.jsonx')
+    with open(tmpfn, 'w', encoding='utf-8') as tmpf:
+        tmpf.write(inp.strip())
+
+    for workers in (None, 3):
+        if exceeded:
+            with pytest.raises(ValueError):
+                xson.loads(inp.strip(), workers=workers, **kw)
+            with open(tmpfn, 'rb') as tmpf:
+                with pytest.raises(ValueError):
+                    xson.load(tmpf, workers=workers, **kw)
+        else:
+            xson.loads(inp.strip(), workers=workers, **kw)
+            with open(tmpfn, 'rb') as tmpf:
+                xson.load(tmpf, workers=workers, **kw)
+
+
+def count_elements(val):
+    if isinstance(val, dict):
+        val = val.values()
+    elif not isinstance(val, list):
+        val = []
+    return 1 + sum(count_elements(v) for v in val)
+
+
+@pytest.mark.parametrize('kw', [
+    {'max_elements': count_elements(xson.loads(inp_large_array.strip())) - 1},
+    {'max_bytes': len(inp_large_array.strip()) - 1},
+], ids=['max_elements', 'max_bytes'])
+def test_load_workers_limits(kw, tmpdir):
+    xson.loads(inp_large_array.strip(), workers=3, max_elements=count_elements(xson.loads(inp_large_array.strip())), max_bytes=len(inp_large_array.strip()))
+
+    with pytest.raises(ValueError):
+        xson.loads(inp_large_array.strip(), workers=3, **kw)
+
+    tmpfn = os.path.join(str(tmpdir), 'tmp.jsonx')
+    with open(tmpfn, 'w', encoding='utf-8') as tmpf:
+        tmpf.write(inp_large_array.strip())
+    with open(tmpfn, 'rb') as tmpf:
+        with pytest.raises(ValueError):
+            xson.load(tmpf, workers=3, **kw)
+
+
+inp_push_docs = [
+    inp_tuple.strip(),
+    inp_limits.strip(),
+    '<json:string xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx">x &lt; y</json:string>',
+    '<json:array xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx"/>',
+    '<json:array xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx"></json:array >',
+    '<json:object xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx"><!-- c --><json:null name="/>"/></json:object>',
+    inp_large_string.strip(),
+]
+
+
+@pytest.mark.parametrize('size', [1, 3, 64, 1 << 20])
+@pytest.mark.parametrize('sep', ['', '\n', ' \r\n\t'])
+def test_push_decoder(size, sep):
+    stream = (sep.join(inp_push_docs) + sep).encode('utf-8')
+    exp = [xson.loads(doc) for doc in inp_push_docs]
+
+    decoder = xson.JSONxPushDecoder()
+    out = []
+    for i in range(0, len(stream), size):
+        out.extend(decoder.feed(stream[i:i + size]))
+    out.extend(decoder.close())
+    assert out == exp
+
+
+def test_push_decoder_kw():
+    decoder = xson.JSONxPushDecoder(object_hook=tuple_object_hook)
+    assert decoder.feed((inp_tuple.strip() * 2).encode('utf-8')) == [exp_tuple, exp_tuple]
+    assert not decoder.close()
+
+    decoder = xson.JSONxPushDecoder(max_depth=2)
+    with pytest.raises(ValueError):
+        decoder.feed(inp_limits.strip().encode('utf-8'))
+
+    doctype = b'<!DOCTYPE json:null [<!ENTITY e "e">]><json:null xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx"/>'
+    assert xson.JSONxPushDecoder().feed(doctype) == [None]
+    decoder = xson.JSONxPushDecoder(forbid_dtd=True)
+    with pytest.raises(ValueError):
+        decoder.feed(doctype)
+
+
+@pytest.mark.parametrize('size', [1, 3, 1000])
+def test_push_decoder_misc(size):
+    doc = '<json:null xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx"/>'
+    stream = f'<!-- a --><?pi x?>{doc}<!-- b -->\n<?xml-stylesheet href="s"?>{inp_tuple.strip()}<?pi?> <!---->{doc}<!-- c --><?pi ?>'.encode('utf-8')
+
+    decoder = xson.JSONxPushDecoder(object_hook=tuple_object_hook)
+    out = []
+    for i in range(0, len(stream), size):
+        out.extend(decoder.feed(stream[i:i + size]))
+    out.extend(decoder.close())
+    assert out == [None, exp_tuple, None]
+
+
+def test_push_decoder_recover():
+    doc = '<json:null xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx"/>'.encode('utf-8')
+    decoder = xson.JSONxPushDecoder(max_depth=2)
+    with pytest.raises(ValueError):
+        decoder.feed(inp_limits.strip().encode('utf-8'))
+    assert decoder.feed(doc) == [None]
+    with pytest.raises(ValueError):
+        decoder.feed(b'<foo/>')
+    assert decoder.feed(doc) == [None]
+    with pytest.raises(ValueError):
+        decoder.feed(b'<!-- c')
+        decoder.close()
+    assert decoder.feed(doc) == [None]
+    assert not decoder.close()
+
+
+class CountingParser:
+    """
+    Parser proxy counting the bytes fed to the parsers.
+    """
+
+    fed = 0
+
+    def __init__(self, parser):
+        object.__setattr__(self, '_parser', parser)
+
+    def Parse(self, data, final=False):
+        CountingParser.fed += len(data)
+        return self._parser.Parse(data, final)
+
+    def __getattr__(self, name):
+        return getattr(self._parser, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._parser, name, value)
+
+
+def push_fed_bytes(stream, monkeypatch):
+    monkeypatch.setattr(sys.modules['xson.load'], 'ParserCreate', lambda *args, **kwargs: CountingParser(ParserCreate(*args, **kwargs)))
+    CountingParser.fed = 0
+
+    decoder = xson.JSONxPushDecoder()
+    out = decoder.feed(stream) + decoder.close()
+    return out, CountingParser.fed
+
+
+def test_push_decoder_linear_documents(monkeypatch):
+    # The data after the end of a document in a fragment is not fed to the
+    # parsers over and over again.
+    fed = []
+    for n in (2000, 8000):
+        vals = [{'id': i, 'name': f'item {i}'} for i in range(n)]
+        out, fed_bytes = push_fed_bytes(b''.join(xson.dumpb(val) for val in vals), monkeypatch)
+        assert out == vals
+        fed.append(fed_bytes)
+    assert fed[1] <= 5 * fed[0]
+
+
+def test_push_decoder_linear_string():
+    # The text of a large string is not kept by the decoder (and with a large
+    # string threshold, not by the handler either).
+    val = 'x' * (4 << 20)
+    stream = xson.dumpb(val)
+    decoder = xson.JSONxPushDecoder(large_string_threshold=1024)
+
+    tracemalloc.start()
+    try:
+        out = []
+        for i in range(0, len(stream), 4096):
+            out.extend(decoder.feed(stream[i:i + 4096]))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    out.extend(decoder.close())
+    assert [read_string_hook(f) for f in out] == [('read', val)]
+    assert peak < len(stream) // 4
+
+
+def test_push_decoder_recover_completed():
+    doc = xson.dumpb(1)
+    decoder = xson.JSONxPushDecoder()
+    with pytest.raises(ValueError):
+        decoder.feed(doc + doc + b'junk>')
+    assert decoder.feed(doc) == [1, 1, 1]
+
+    with pytest.raises(ValueError):
+        decoder.feed(doc + b'<foo/>')
+    assert decoder.close() == [1]
+    assert not decoder.close()
+
+
+@pytest.mark.parametrize('stream', [
+    inp_tuple.strip()[:-1],
+    inp_tuple.strip() + '<json:null/>',
+    inp_tuple.strip() + '</json:object>',
+    inp_tuple.strip().replace('</json:array>', '</json:object>'),
+])
+def test_push_decoder_error(stream):
+    decoder = xson.JSONxPushDecoder()
+    with pytest.raises(ValueError):
+        decoder.feed(stream.encode('utf-8'))
+        decoder.close()
+
+
+inp_dedupe = '''
+<?xml version="1.0" encoding="UTF-8"?>
+<json:array xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx">
+    <json:object><json:string name="unit">metre</json:string><json:number name="n">1</json:number></json:object>
+    <json:object><json:string name="unit">metre</json:string><json:number name="n">1</json:number></json:object>
+    <json:object><json:string name="unit">metre</json:string><json:boolean name="n">true</json:boolean></json:object>
+    <json:string>metre</json:string>
+    <json:number>0.0</json:number>
+    <json:number>-0.0</json:number>
+    <json:number>1.0</json:number>
+    <json:number>1.00</json:number>
+    <json:number>1</json:number>
+</json:array>
+'''
+
+
+def test_load_dedupe():
+    exp = xson.loads(inp_dedupe.strip())
+
+    val = xson.loads(inp_dedupe.strip(), dedupe=True)
+    assert val == exp
+    assert val[0]['unit'] is val[1]['unit'] is val[2]['unit'] is val[3]
+    assert next(iter(val[0])) is next(iter(val[1])) is next(iter(val[2]))
+    assert [str(v) for v in val[4:]] == ['0.0', '-0.0', '1.0', '1.0', '1']
+    assert val[6] is val[7]
+    assert val[6] is not val[8]
+
+    val = xson.loads(inp_dedupe.strip(), dedupe=True, object_pairs_hook=tuple)
+    assert val[0] is val[1]
+    assert val[0] == val[2] and val[0] is not val[2]
+    assert val[2][1] == ('n', True)
+
+    val = xson.loads(inp_dedupe.strip(), dedupe=True, parse_float=Decimal)
+    assert [str(v) for v in val[4:]] == ['0.0', '-0.0', '1.0', '1.00', '1']
+
+
+val_many = [{'id': i, 'name': f'item <{i}>', 'tags': ['a', 'b'][:i % 3], 'ratio': i / 7, 'nested': {'x': [None, True, i]}} for i in range(1000)]
+
+
+@pytest.mark.parametrize('kw', [
+    {},
+    {'object_pairs_hook': tuple, 'dedupe': True},
+    {'parse_int': parse_int_str, 'max_depth': 5, 'forbid_dtd': True},
+])
+def test_loads_many(kw):
+    docs = [xson.dumps(val, indent=i % 3 or None) for i, val in enumerate(val_many)]
+    docs[1::2] = [doc.encode('utf-8') for doc in docs[1::2]]
+    exp = [xson.loads(doc if isinstance(doc, str) else doc.decode('utf-8'), **kw) for doc in docs]
+
+    # Make threads switch as often as possible to expose races on builds with
+    # the GIL, too.
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for workers in (None, 1, 8):
+            for _ in range(3):
+                assert xson.loads_many(docs, workers=workers, **kw) == exp
+    finally:
+        sys.setswitchinterval(interval)
+
+
+def test_loads_many_error():
+    docs = [xson.dumps(val) for val in val_many]
+    docs[500] = docs[500].replace('</json:object>', '', 1)
+    with pytest.raises(ValueError):
+        xson.loads_many(docs, workers=8)
+
+
+inp_lazy = f'''
+<?xml version="1.0" encoding="UTF-8"?>
+<json:array xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx">
+    <json:number> 42 </json:number>
+    <json:number>1.50</json:number>
+    <json:number>-0.0</json:number>
+    <json:number>1e999</json:number>
+    <json:number>NaN</json:number>
+    <json:number>{'9' * 10000}</json:number>
+    <json:number>1.50</json:number>
+</json:array>
+'''
+
+
+def test_load_lazy_numbers():
+    val = xson.loads(inp_lazy.strip(), numbers='lazy')
+    assert all(isinstance(v, xson.JSONxNumber) for v in val)
+    assert [v.lexeme for v in val] == ['42', '1.50', '-0.0', '1e999', 'NaN', '9' * 10000, '1.50']
+    assert val[0] == 42 and val[0] + 1 == 43 and 1 - val[0] == -41 and [1] * val[0] == [1] * 42
+    assert val[1] == 1.5 and hash(val[1]) == hash(1.5) and round(val[1]) == 2
+    assert val[1] < val[0]
+    assert str(val[2]) == '-0.0' and -val[2] == 0.0
+    assert val[3].value == inf and isnan(val[4].value)
+    if sys.int_info.default_max_str_digits and sys.get_int_max_str_digits() < 10000:
+        with pytest.raises(ValueError, match='lexeme'):
+            val[5].value  # pylint: disable=pointless-statement
+        with pytest.raises(ValueError):
+            val[5] + 1  # pylint: disable=pointless-statement
+    else:
+        assert val[5].value == int('9' * 10000)
+    assert val[1] is not val[6]
+
+    val = xson.loads(inp_lazy.strip(), numbers='lazy', dedupe=True)
+    assert val[1] is val[6]
+
+    assert xson.dumps(xson.loads(inp_lazy.strip(), numbers='lazy'), indent=4).strip() == inp_lazy.strip().replace(' 42 ', '42')
+
+
+def test_lazy_number_operators():
+    big = xson.JSONxNumber('12345678901234567891')
+    neg = xson.JSONxNumber('-2.50')
+    assert math.floor(big) == math.ceil(big) == math.trunc(big) == 12345678901234567891
+    assert (math.floor(neg), math.ceil(neg), math.trunc(neg)) == (-3, -2, -2)
+    assert (f'{neg}', f'{neg:.1f}', f'{big:,}', f'{big:x}') == ('-2.50', '-2.5', '12,345,678,901,234,567,891', 'ab54a98ceb1f0ad3')
+    assert (big & 0xff, 0xff & big, big | 4, 4 | big, big ^ big, 1 ^ big) == (0xd3, 0xd3, big.value | 4, big.value | 4, 0, big.value ^ 1)
+    assert (big << 2, 1 << xson.JSONxNumber('3'), big >> 60, 1024 >> xson.JSONxNumber('3'), ~big) == (big.value * 4, 8, 10, 128, -big.value - 1)
+    with pytest.raises(TypeError):
+        neg & 1  # pylint: disable=pointless-statement
+
+
+@pytest.mark.parametrize('inp, kw', [
+    ('<json:number xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx">0x10</json:number>', {'numbers': 'lazy'}),
+    ('<json:number xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx">1</json:number>', {'numbers': 'lazy', 'parse_int': int}),
+    ('<json:number xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx">1</json:number>', {'numbers': 'strict'}),
+])
+def test_load_lazy_numbers_error(inp, kw):
+    with pytest.raises(ValueError):
+        xson.loads(inp, **kw)
+
+
+def test_load_lazy_numbers_workers():
+    inp = xson.dumps([{'id': i, 'ratio': i / 7} for i in range(5000)])
+    val = xson.loads(inp, numbers='lazy', workers=2)
+    assert val == xson.loads(inp)
+    assert isinstance(val[-1]['ratio'], xson.JSONxNumber)
+    assert xson.dumps(val) == inp
@@ -0,0 +1,82 @@
+# Copyright (c) 2026 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+from io import BytesIO, StringIO
+from math import inf
+
+import pytest
+
+import xson
+
+
+@pytest.mark.parametrize('val', [
+    None,
+    True,
+    42,
+    -inf,
+    '',
+    'foo <&> "bar" \'baz\'',
+    [],
+    {},
+    [None, True, False, 0, 1, -1, 42, 3.14, -1.28, inf, -inf, '', 'foo', [], {}],
+    {'': None, 'b': True, 'a': False, 'c': 0, 'd': {'z': [[], [{}]], 'y': {'x': 1, 'w': 2}}, 'e': [{'q': 1, 'p': 2}], 'a"b\n': 'c'},
+])
+@pytest.mark.parametrize('kw', [
+    {},
+    {'indent': 2},
+    {'indent': ''},
+    {'indent': '\t', 'sort_keys': True},
+    {'sort_keys': True},
+])
+def test_reformat(val, kw):
+    inp = xson.dumps(val, indent=3)
+    exp = xson.dumps(xson.loads(inp), **kw)
+
+    out = StringIO()
+    xson.reformat(StringIO(inp), out, **kw)
+    assert out.getvalue() == exp
+
+    out = BytesIO()
+    xson.reformat(BytesIO(inp.encode('utf-8')), out, **kw)
+    assert out.getvalue() == exp.encode('utf-8')
+
+
+inp_lexemes = '''
+<?xml version="1.0" encoding="UTF-8"?>
+<json:object xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx">
+    <json:number name="b">1.50</json:number>
+    <json:number name="a"> 1e400 </json:number>
+    <json:number name="c">123456789012345678901234567890123456789012345678901234567890</json:number>
+</json:object>
+'''
+exp_lexemes = '''
+<?xml version="1.0" encoding="UTF-8"?>
+<json:object xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx"><json:number name="a">1e400</json:number><json:number name="b">1.50</json:number><json:number name="c">123456789012345678901234567890123456789012345678901234567890</json:number></json:object>
+'''
+
+
+def test_reformat_lexemes():
+    out = StringIO()
+    xson.reformat(StringIO(inp_lexemes.strip()), out, sort_keys=True)
+    assert out.getvalue().strip() == exp_lexemes.strip()
+
+
+@pytest.mark.parametrize('inp', [
+    '<json:null xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx">x</json:null>',
+    '<json:object xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx"><json:null/></json:object>',
+    '<json:number xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx">x</json:number>',
+    '<json:boolean xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx">True</json:boolean>',
+    '<json:string xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx"><json:null/></json:string>',
+    '<json:foo xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx"/>',
+    '<json:null xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx">',
+    '<null/>',
+])
+def test_reformat_error(inp):
+    with pytest.raises(ValueError):
+        xson.loads(inp)
+    with pytest.raises(ValueError):
+        xson.reformat(StringIO(inp), StringIO())
@@ -0,0 +1,109 @@
+# Copyright (c) 2026 Renata Hodovan, Akos Kiss.
+#
+# Licensed under the BSD 3-Clause License
+# <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
+# This file may not be copied, modified, or distributed except
+# according to those terms.
+
+from io import BytesIO
+
+import pytest
+
+import xson
+
+
+class ShardIO(BytesIO):
+
+    def __init__(self, shards):
+        super().__init__()
+        self._shards = shards
+
+    def close(self):
+        self._shards.append(self.getvalue())
+        super().close()
+
+
+val_items = [{'id': i, 'name': f'item <{i}/>', 'tags': ['a', 'b'][:i % 3], 'ratio': i / 7, 'empty': [{}, []]} for i in range(50)] + [None, '', 1.50, [[]]]
+
+
+@pytest.mark.parametrize('kw', [
+    {},
+    {'indent': 4},
+    {'indent': '\t'},
+    {'indent': 0, 'prefix': None},
+])
+@pytest.mark.parametrize('max_items, max_bytes', [
+    (7, None),
+    (None, 1000),
+    (10, 1000),
+    (1000, None),
+])
+def test_split_merge(kw, max_items, max_bytes):
+    inp = xson.dumpb(val_items, **kw)
+
+    shards = []
+    n = xson.split_array(BytesIO(inp), lambda index: ShardIO(shards), max_items=max_items, max_bytes=max_bytes)
+    assert n == len(shards)
+
+    start = 0
+    for shard in shards:
+        val = xson.loads(shard.decode('utf-8'))
+        assert 0 < len(val) <= (max_items or len(val_items))
+        assert len(shard) <= (max_bytes or len(shard)) or len(val) == 1
+        # Shards are formatted the same way as if they were dumped directly.
+        assert shard == xson.dumpb(val_items[start:start + len(val)], **kw)
+        start += len(val)
+    assert start == len(val_items)
+
+    out = BytesIO()
+    assert xson.merge_arrays([BytesIO(shard) for shard in shards], out) == len(val_items)
+    assert out.getvalue() == inp
+
+
+def test_merge_layouts():
+    inps = [
+        xson.dumpb([], indent=2),
+        xson.dumpb([1, {'a': 'b'}], indent=2),
+        xson.dumpb([2.50, {'a': 'c'}], prefix=None),
+        '<?xml version="1.0" encoding="ISO-8859-1"?><j:array xmlns:j="http://www.ibm.com/xmlns/prod/2009/jsonx"><j:number>1.50</j:number><j:string>\xe9</j:string></j:array>'.encode('latin-1'),
+        xson.dumpb([None, [True]], indent=2),
+    ]
+
+    out = BytesIO()
+    assert xson.merge_arrays([BytesIO(inp) for inp in inps], out) == 8
+    # Items of documents with a different layout are serialized again.
+    assert out.getvalue() == xson.dumpb([1, {'a': 'b'}, 2.5, {'a': 'c'}, xson.JSONxNumber('1.50'), '\xe9', None, [True]], indent=2)
+
+
+@pytest.mark.parametrize('inp', [
+    b'<json:array xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx"/>',
+    b'<?xml version="1.0"?>\n<array xmlns="http://www.ibm.com/xmlns/prod/2009/jsonx">\n</array>\n',
+])
+def test_split_merge_empty(inp):
+    shards = []
+    assert xson.split_array(BytesIO(inp), lambda index: ShardIO(shards), max_items=1) == 1
+    assert xson.loads(shards[0].decode('utf-8')) == []
+
+    out = BytesIO()
+    assert xson.merge_arrays([BytesIO(inp), BytesIO(inp)], out) == 0
+    assert xson.loads(out.getvalue().decode('utf-8')) == []
+
+
+@pytest.mark.parametrize('inp', [
+    b'<json:object xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx"/>',
+    b'<json:array xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx"><json:foo/></json:array>',
+    b'<json:array xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx">foo</json:array>',
+    b'<json:array xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx"><json:null></json:array>',
+    b'<!DOCTYPE a [<!ENTITY e "e">]><json:array xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx"/>',
+    '<json:array xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx"/>'.encode('utf-16'),
+])
+def test_split_merge_error(inp):
+    with pytest.raises(ValueError):
+        xson.split_array(BytesIO(inp), lambda index: ShardIO([]), max_items=1)
+    with pytest.raises(ValueError):
+        xson.merge_arrays([BytesIO(inp)], BytesIO())
+
+
+def test_split_no_limit():
+    with pytest.raises(ValueError):
+        xson.split_array(BytesIO(xson.dumpb([])), lambda index: ShardIO([]))
@@ -1,16 +1,21 @@
-# Copyright (c) 2021-2023 Renata Hodovan, Akos Kiss.
+# Copyright (c) 2021-2026 Renata Hodovan, Akos Kiss.
 #
 # Licensed under the BSD 3-Clause License
 # <LICENSE.rst or https://opensource.org/licenses/BSD-3-Clause>.
 # This file may not be copied, modified, or distributed except
 # according to those terms.
 
+import bz2
+import gzip
+import lzma
 import os
 import subprocess
 import sys
 
 import pytest
 
+import xson
+
 
 question_json = '''
 {
@@ -139,3 +144,100 @@ def test_tool(indent_arg, indent_jsonx, indent_json, infile, outfile, infile_jso
     out = out.strip()
 
     assert out == exp
+
+
+@pytest.mark.parametrize('infile_ext, outfile_ext, compress_arg, decompress', [
+    ('.jsonx.gz', '.jsonx.bz2', None, bz2.decompress),
+    ('.jsonx.xz', '.jsonx', None, bytes),
+    ('.jsonx.bz2', '.jsonx', '--compress=xz', lzma.decompress),
+    ('.jsonx', '.jsonx.gz', '--compress=none', bytes),
+])
+def test_tool_compress(infile_ext, outfile_ext, compress_arg, decompress, tmpdir):
+    infile_name = os.path.join(str(tmpdir), f'in{infile_ext}')
+    with xson.open_compressed(infile_name, 'wt') as f:
+        f.write(question_jsonx.strip())
+
+    outfile_name = os.path.join(str(tmpdir), f'out{outfile_ext}')
+    cmd = [sys.executable, '-m', 'xson.tool', '--sort-keys', infile_name, outfile_name]
+    if compress_arg:
+        cmd += [compress_arg]
+    subprocess.run(cmd, check=True)
+
+    with open(outfile_name, 'rb') as f:
+        out = decompress(f.read()).decode('utf-8')
+    assert out.strip() == question_jsonx.strip()
+
+
+def test_tool_compress_stdio():
+    inp = gzip.compress(question_jsonx.strip().encode('utf-8'))
+    result = subprocess.run([sys.executable, '-m', 'xson.tool', '--sort-keys', '--compress=bz2'], input=inp, stdout=subprocess.PIPE, check=True)
+    assert bz2.decompress(result.stdout).decode('utf-8').strip() == question_jsonx.strip()
+
+
+@pytest.mark.parametrize('ext', ['.jsonx', '.jsonx.gz'])
+def test_tool_inplace(ext, tmpdir):
+    file_name = os.path.join(str(tmpdir), f'inout{ext}')
+    with xson.open_compressed(file_name, 'wt') as f:
+        f.write(question_jsonx.strip())
+
+    subprocess.run([sys.executable, '-m', 'xson.tool', '--sort-keys', file_name, file_name], check=True)
+
+    with xson.open_compressed(file_name, 'rt') as f:
+        assert f.read().strip() == question_jsonx.strip()
+
+
+def test_tool_invalid_outfile_kept(tmpdir):
+    infile_name = os.path.join(str(tmpdir), 'in.jsonx')
+    with open(infile_name, 'w', encoding='utf-8') as f:
+        f.write('<json:array xmlns:json="http://www.ibm.com/xmlns/prod/2009/jsonx"><json:null/>')
+    outfile_name = os.path.join(str(tmpdir), 'out.jsonx')
+    with open(outfile_name, 'w', encoding='utf-8') as f:
+        f.write('kept')
+
+    result = subprocess.run([sys.executable, '-m', 'xson.tool', infile_name, outfile_name], stderr=subprocess.PIPE, check=False)
+    assert result.returncode != 0
+    with open(outfile_name, 'r', encoding='utf-8') as f:
+        assert f.read() == 'kept'
+
+
+def test_tool_split_merge(tmpdir):
+    val = [{'id': i, 'name': f'item {i}'} for i in range(25)]
+    infile_name = os.path.join(str(tmpdir), 'in.jsonx.gz')
+    with xson.open_compressed(infile_name, 'wb') as f:
+        xson.dump(val, f, indent=4)
+
+    subprocess.run([sys.executable, '-m', 'xson.tool', 'split', '--max-items=10', infile_name], check=True)
+    shard_names = [os.path.join(str(tmpdir), f'in-{i:04d}.jsonx.gz') for i in range(3)]
+    for i, shard_name in enumerate(shard_names):
+        with xson.open_compressed(shard_name, 'rb') as f:
+            assert xson.load(f) == val[i * 10:i * 10 + 10]
+    assert not os.path.exists(os.path.join(str(tmpdir), 'in-0003.jsonx.gz'))
+
+    result = subprocess.run([sys.executable, '-m', 'xson.tool', 'merge', *shard_names], stdout=subprocess.PIPE, check=True)
+    assert result.stdout == xson.dumpb(val, indent=4)
+
+    outfile_name = os.path.join(str(tmpdir), 'out.jsonx.xz')
+    subprocess.run([sys.executable, '-m', 'xson.tool', 'merge', *shard_names, '-o', outfile_name], check=True)
+    with open(outfile_name, 'rb') as f:
+        assert lzma.decompress(f.read()) == xson.dumpb(val, indent=4)
+
+
+def test_tool_split_stdin(tmpdir):
+    inp = xson.dumpb(list(range(25)))
+    pattern = os.path.join(str(tmpdir), 'shard{}.jsonx')
+    subprocess.run([sys.executable, '-m', 'xson.tool', 'split', '--max-bytes=300', '-o', pattern], input=inp, check=True)
+
+    out = []
+    i = 0
+    while os.path.exists(pattern.format(i)):
+        with open(pattern.format(i), 'rb') as f:
+            shard = f.read()
+        assert len(shard) <= 300
+        out += xson.loads(shard.decode('utf-8'))
+        i += 1
+    assert i > 1 and out == list(range(25))
+
+
+def test_tool_split_no_limit():
+    result = subprocess.run([sys.executable, '-m', 'xson.tool', 'split'], input=b'', stderr=subprocess.PIPE, check=False)
+    assert result.returncode != 0